@@ -1,35 +1,149 @@
+import json
+import os
+import threading
+import time
+
 import pandas as pd
 import joblib
 import numpy as np
-from zenml.client import Client
-from zenml.integrations.mlflow.services import MLFlowDeploymentService
-from zenml.integrations.mlflow.model_deployers.mlflow_model_deployer import (
-    MLFlowModelDeployer,
-)
-from flask import Flask, render_template, request
+
+from serving.batcher import MicroBatcher
+from steps.encoders import ENCODERS_PATH, EncoderSet
+from steps.feature_transform import FEATURE_TRANSFORM_PATH, FeatureTransform
+from steps.price_optimizer import linear_coefficients
 
 """
 Flask Application for Retail Price Optimization.
 Serves a web interface for predicting sales quantity based on product features.
 Connects to either a running MLflow service or a local model artifact.
+zenml/MLflow are only imported when the service is looked up, which happens
+in the background with LAZY_STARTUP=1 (see load_resources).
 """
-from flask import Flask, render_template, request
+from flask import Flask, Response, jsonify, render_template, request, stream_with_context
 
 # Initialize Flask application
 app = Flask(__name__)
+# Batch API limits (rows per request / rows per vectorized predict call)
+app.config["MAX_BATCH_SIZE"] = int(os.getenv("MAX_BATCH_SIZE", "100000"))
+app.config["BATCH_CHUNK_SIZE"] = int(os.getenv("BATCH_CHUNK_SIZE", "10000"))
+# Largest request body accepted, checked before anything is parsed (also caps chunked uploads)
+app.config["MAX_BATCH_BYTES"] = int(os.getenv("MAX_BATCH_BYTES", str(64 * 1024 * 1024)))
+app.config["MAX_CONTENT_LENGTH"] = app.config["MAX_BATCH_BYTES"]
+# Coalescing of single-row requests to the MLflow service (MICROBATCH=0 disables)
+app.config["MICROBATCH"] = os.getenv("MICROBATCH", "1") == "1"
+app.config["MICROBATCH_MAX_ROWS"] = int(os.getenv("MICROBATCH_MAX_ROWS", "256"))
+app.config["MICROBATCH_MAX_WAIT_MS"] = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "5"))
+# Serve from model.pkl right away and look up the MLflow service in the background
+app.config["LAZY_STARTUP"] = os.getenv("LAZY_STARTUP", "0") == "1"
 
 # Global variables
 model_service = None
+batcher = None
+batcher_lock = threading.Lock()
 local_model = None
+fast_scorer = None
+feature_transform = None
+encoders = None
+text_fields = []
 predictors = []
 mode = "unknown"
+# Startup progress reported by /health
+status = {"local": "pending", "mlflow": "pending", "started_at": time.time(), "ready_at": None}
 
-def load_resources():
-    global model_service, local_model, predictors, mode
-    
-    # 1. Try MLflow Service
+
+class LinearFastScorer:
+    """
+    Compiled single-row scorer for linear models (coef_ / intercept_).
+
+    Skips pandas and sklearn input validation: form fields are written into a
+    preallocated per-thread NumPy vector in `predictors` order and scored with
+    one dot product.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: float, predictors: list, encoders=None):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.predictors = list(predictors)
+        # Raw categorical fields are mapped to codes with the training encoders
+        self.encoded = {}
+        if encoders is not None:
+            self.encoded = {i: encoders.encoders[col] for i, col in enumerate(self.predictors) if col in encoders.encoders}
+        self._local = threading.local()
+
+    @classmethod
+    def from_model(cls, model, predictors: list, encoders=None):
+        """Returns a scorer for linear models, or None if the model isn't one."""
+        # Coefficients aligned to the order the app reads form fields in
+        linear = linear_coefficients(model, predictors)
+        if linear is None:
+            return None
+        return cls(*linear, predictors, encoders)
+
+    def _buffer(self) -> np.ndarray:
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = np.empty(len(self.predictors), dtype=np.float64)
+        return buf
+
+    def predict_one(self, form) -> float:
+        """Scores one mapping of field -> value; empty or missing fields are 0.0."""
+        buf = self._buffer()
+        encoded = self.encoded
+        for i, col in enumerate(self.predictors):
+            val = form.get(col)
+            if not val:
+                buf[i] = 0.0
+            elif i in encoded:
+                buf[i] = encoded[i].transform_one(val)
+            else:
+                buf[i] = float(val)
+        return float(buf.dot(self.coef)) + self.intercept
+
+
+def load_preprocessing():
+    """
+    Loads the preprocessing fitted at training time.
+
+    Prefers the full FeatureTransform; older artifacts only have the
+    categorical encoders.
+    """
+    global feature_transform, encoders, text_fields
+    try:
+        if os.path.exists(FEATURE_TRANSFORM_PATH):
+            feature_transform = FeatureTransform.load(FEATURE_TRANSFORM_PATH)
+            encoders = feature_transform.encoders
+        elif os.path.exists(ENCODERS_PATH):
+            encoders = EncoderSet.load(ENCODERS_PATH)
+        else:
+            return
+        text_fields = [col for col, enc in encoders.encoders.items() if enc.classes_.dtype.kind not in "iuf"]
+        print(f"Loaded preprocessing (categorical columns: {encoders.columns}).")
+    except Exception as e:
+        print(f"Preprocessing loading error: {e}")
+
+
+def set_mode(new_mode):
+    """Switches the scoring mode; the first servable mode marks the app ready."""
+    global mode
+    mode = new_mode
+    if new_mode in ("local", "mlflow") and status["ready_at"] is None:
+        status["ready_at"] = time.time()
+
+
+def connect_mlflow() -> bool:
+    """
+    Looks up the running MLflow prediction service and switches to it.
+
+    zenml and the MLflow deployer are imported here rather than at module
+    level; importing them is most of the app's cold start.
+    """
+    global model_service, predictors
     try:
         print("Attempting to connect to MLflow Model Deployer...")
+        from zenml.integrations.mlflow.model_deployers.mlflow_model_deployer import (
+            MLFlowModelDeployer,
+        )
+
         deployer = MLFlowModelDeployer.get_active_model_deployer()
         services = deployer.find_model_server(
             pipeline_name="deployment_pipeline",
@@ -38,34 +152,99 @@ def load_resources():
             running=True,
         )
         
-        if services:
-            model_service = services[0]
-            mode = "mlflow"
-            print(f"Connected to MLflow service: {model_service.prediction_url}")
-            # Try to infer predictors or use fallback list
-            # For simplicity, we use the hardcoded list or load from file if exists
-            if not predictors:
-                 try:
-                     predictors = joblib.load("predictors.pkl")
-                 except:
-                     pass
-        else:
+        if not services:
             print("No running MLflow service found.")
+            status["mlflow"] = "not found"
+            return False
+
+        # Try to infer predictors or use fallback list
+        # For simplicity, we use the hardcoded list or load from file if exists
+        if not predictors:
+             try:
+                 predictors = joblib.load("predictors.pkl")
+             except:
+                 pass
+        model_service = services[0]
+        # Switch last, so requests only see the service once it is set up
+        set_mode("mlflow")
+        status["mlflow"] = "connected"
+        print(f"Connected to MLflow service: {model_service.prediction_url}")
+        return True
             
     except Exception as e:
         print(f"MLflow connection error: {e}")
+        status["mlflow"] = f"error: {e}"
+        return False
 
-    # 2. Fallback to Local Model
-    if mode != "mlflow":
-        try:
-            print("Attempting to load local model.pkl...")
-            local_model = joblib.load("model.pkl")
-            predictors = joblib.load("predictors.pkl")
-            mode = "local"
-            print("Local model loaded successfully.")
-        except Exception as e:
-            print(f"Local model loading error: {e}")
-            mode = "none"
+
+def service_batcher():
+    """
+    The micro-batcher for MLflow mode, created on first use.
+
+    Not built when the service is found, so processes that import this module
+    without serving the Flask form (the asgi.py workers, which batch on their
+    event loop) don't start its dispatcher thread and pool.
+    """
+    global batcher
+    if batcher is None and mode == "mlflow" and app.config["MICROBATCH"]:
+        with batcher_lock:
+            if batcher is None:
+                batcher = MicroBatcher(
+                    lambda X: service_predict(pd.DataFrame(X, columns=predictors)),
+                    max_rows=app.config["MICROBATCH_MAX_ROWS"],
+                    max_wait_ms=app.config["MICROBATCH_MAX_WAIT_MS"],
+                )
+    return batcher
+
+
+def load_local_model() -> bool:
+    """Loads model.pkl / predictors.pkl (and the compiled linear scorer when possible)."""
+    global local_model, fast_scorer, predictors
+    try:
+        print("Attempting to load local model.pkl...")
+        model = joblib.load("model.pkl")
+        model_predictors = joblib.load("predictors.pkl")
+        fast_scorer = LinearFastScorer.from_model(model, model_predictors, encoders)
+        local_model, predictors = model, model_predictors
+        status["local"] = "loaded"
+        print("Local model loaded successfully.")
+        if fast_scorer is not None:
+            print("Using compiled linear scoring path for single-row requests.")
+        return True
+    except Exception as e:
+        print(f"Local model loading error: {e}")
+        status["local"] = f"error: {e}"
+        return False
+
+
+def resolve_service():
+    """Background part of a lazy startup: switches to the MLflow service once it is found."""
+    if not connect_mlflow() and mode != "local":
+        set_mode("none")
+
+
+def load_resources():
+    """
+    Loads the model the app scores with.
+
+    By default the MLflow service is looked up first and model.pkl is the
+    fallback. With LAZY_STARTUP=1 the app serves from model.pkl as soon as it
+    is loaded and looks up the service on a background thread, switching to
+    it when found; /health reports the progress.
+    """
+    global predictors
+
+    load_preprocessing()
+
+    if app.config["LAZY_STARTUP"]:
+        set_mode("local" if load_local_model() else "none")
+        status["mlflow"] = "resolving"
+        threading.Thread(target=resolve_service, name="mlflow-lookup", daemon=True).start()
+    elif connect_mlflow():
+        status["local"] = "not loaded"
+    else:
+        # Fallback to Local Model
+        set_mode("local" if load_local_model() else "none")
 
     # Default predictors if still missing
     if not predictors:
@@ -76,52 +255,233 @@ def load_resources():
                       'month', 'year', 'volume', 'comp_1', 'ps1', 'fp1', 'comp_2', 
                       'ps2', 'fp2', 'comp_3', 'ps3', 'fp3', 'lag_price']
 
+
+def health_status() -> dict:
+    """Readiness summary: ready once a model (local or MLflow) can serve requests."""
+    ready_at = status["ready_at"]
+    return {
+        "ready": mode in ("local", "mlflow"),
+        "mode": mode,
+        "local_model": status["local"],
+        "mlflow": status["mlflow"],
+        "startup_seconds": None if ready_at is None else round(ready_at - status["started_at"], 3),
+    }
+
+
+def service_predict(df):
+    """One call to the MLflow prediction service; returns a 1-D float array."""
+    json_data = df.to_json(orient="split")
+    response = model_service.predict(json_data)
+    # response typically numpy array
+    return np.asarray(response, dtype=float).reshape(-1)
+
+
 load_resources()
 
+
+def score_frame(df):
+    """
+    Scores a DataFrame of predictor rows in one call.
+
+    Args:
+        df: DataFrame with columns in `predictors` order.
+
+    Returns:
+        np.ndarray: 1-D array of predictions, one per row.
+    """
+    if mode == "mlflow":
+        return service_predict(df)
+    elif mode == "local":
+        return np.asarray(local_model.predict(df), dtype=float).reshape(-1)
+    raise RuntimeError("No model available (MLflow or Local).")
+
+
+def form_row(form) -> list:
+    """Encodes one form submission as a list of floats in `predictors` order (empty fields are 0.0)."""
+    encoded = encoders.encoders if encoders is not None else {}
+    row = []
+    for col in predictors:
+        val = form.get(col)
+        if not val:
+            row.append(0.0) # Default
+        elif col in encoded:
+            row.append(float(encoded[col].transform_one(val)))
+        else:
+            row.append(float(val))
+    return row
+
+
+def predict_form(form) -> float:
+    """
+    Scores a single form submission.
+
+    Uses the compiled linear path in local mode when available. In MLflow
+    mode the row joins a micro-batch with concurrent requests (one service
+    call per batch); otherwise a one-row DataFrame goes through score_frame.
+    """
+    if mode == "local" and fast_scorer is not None:
+        return fast_scorer.predict_one(form)
+
+    row = form_row(form)
+    coalescer = service_batcher() if mode == "mlflow" else None
+    if coalescer is not None:
+        return float(coalescer.submit(row)[0])
+    return score_frame(pd.DataFrame([row], columns=predictors))[0]
+
+
+def payload_rows(payload) -> int:
+    """
+    Row count of a JSON batch payload (see frame_from_payload), without building a DataFrame.
+
+    Raises ValueError for payloads of the wrong shape, including rows that
+    aren't JSON objects (records) or arrays (split).
+    """
+    if isinstance(payload, list):
+        if not all(isinstance(row, dict) for row in payload):
+            raise ValueError("Each row of a JSON array payload must be an object.")
+        return len(payload)
+    if isinstance(payload, dict) and "data" in payload and "columns" in payload:
+        if not isinstance(payload["data"], list) or not all(isinstance(row, list) for row in payload["data"]):
+            raise ValueError('"data" must be an array of row arrays.')
+        return len(payload["data"])
+    if isinstance(payload, dict):
+        column = next(iter(payload.values()), [])
+        return len(column) if isinstance(column, list) else 1
+    raise ValueError("Payload must be a JSON array of rows or an object of columns.")
+
+
+def frame_from_payload(payload):
+    """
+    Builds a predictor DataFrame from a JSON batch payload.
+
+    Accepted shapes:
+        - records: [{"unit_price": 45.9, ...}, ...]
+        - split:   {"columns": [...], "data": [[...], ...]}
+        - columnar: {"unit_price": [45.9, ...], ...}
+
+    Missing predictors default to 0.0 (same as the form), unknown keys are ignored.
+    When the training FeatureTransform is available, rows may be raw table rows
+    (product_id "bed1", month_year, ...) and go through the same transform as
+    training; otherwise categorical columns are mapped with the encoders.
+    """
+    try:
+        if isinstance(payload, list):
+            df = pd.DataFrame.from_records(payload)
+        elif isinstance(payload, dict) and "data" in payload and "columns" in payload:
+            df = pd.DataFrame(payload["data"], columns=payload["columns"])
+        elif isinstance(payload, dict):
+            df = pd.DataFrame(payload)
+        else:
+            raise ValueError("Payload must be a JSON array of rows or an object of columns.")
+    except TypeError as e:
+        raise ValueError(f"Malformed payload: {e}") from e
+
+    try:
+        if feature_transform is not None:
+            X = feature_transform.transform_frame(df)
+            if feature_transform.predictors != list(predictors):
+                X = X.reindex(columns=predictors, fill_value=0.0)
+            return X
+
+        df = df.reindex(columns=predictors)
+        if encoders is not None:
+            for col, encoder in encoders.encoders.items():
+                if col in df.columns:
+                    df[col] = pd.Series(encoder.transform(df[col]), index=df.index).where(df[col].notna())
+        df = df.astype(float)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Non-numeric predictor value: {e}")
+    return df.fillna(0.0)
+
+
 @app.route("/", methods=["GET", "POST"])
 def home():
     prediction = None
     
     if request.method == "POST":
         if mode == "none":
-            return render_template("index.html", prediction="Error: No model available (MLflow or Local).", predictors=predictors)
+            return render_template("index.html", prediction="Error: No model available (MLflow or Local).", predictors=predictors, text_fields=text_fields)
             
         try:
-            # Build input
-            input_data = {}
-            for col in predictors:
-                val = request.form.get(col)
-                if val:
-                    input_data[col] = float(val)
-                else:
-                    input_data[col] = 0.0 # Default
-            
-            df = pd.DataFrame([input_data])
-            
-            pred = 0.0
-            if mode == "mlflow":
-                json_data = df.to_json(orient="split")
-                response = model_service.predict(json_data)
-                # response typically numpy array
-                if hasattr(response, "flatten"):
-                     pred = response.flatten()[0]
-                elif isinstance(response, list):
-                     pred = response[0]
-                else:
-                     pred = float(response)
-                     
-            elif mode == "local":
-                # Ensure input structure matches exactly what model expects?
-                # Sklearn is lenient usually if columns match
-                resp = local_model.predict(df)
-                pred = resp[0]
+            pred = predict_form(request.form)
                 
             prediction = f"Predicted Sales Quantity: {pred:.2f} (Mode: {mode})"
             
         except Exception as e:
             prediction = f"Prediction Error: {e}"
 
-    return render_template("index.html", prediction=prediction, predictors=predictors)
+    return render_template("index.html", prediction=prediction, predictors=predictors, text_fields=text_fields)
+
+
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    JSON batch scoring API.
+
+    The body size (MAX_BATCH_BYTES) and row count (MAX_BATCH_SIZE) are
+    checked before the DataFrame is built, and every row is validated up
+    front. The first chunk of BATCH_CHUNK_SIZE rows is scored before the
+    response starts, so a failing model or service gets a proper error
+    status; the rest are scored and streamed back as
+    {"mode", "count", "predictions"}. If a later chunk fails, the body is
+    closed with an "error" key instead of being cut off.
+    """
+    if mode == "none":
+        return jsonify(error="No model available (MLflow or Local)."), 503
+
+    max_bytes = app.config["MAX_BATCH_BYTES"]
+    if request.content_length is not None and request.content_length > max_bytes:
+        return jsonify(error=f"Request body of {request.content_length} bytes exceeds MAX_BATCH_BYTES={max_bytes}."), 413
+
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify(error="Request body must be JSON."), 400
+    try:
+        n_rows = payload_rows(payload)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    max_rows = app.config["MAX_BATCH_SIZE"]
+    if n_rows > max_rows:
+        return jsonify(error=f"Batch of {n_rows} rows exceeds MAX_BATCH_SIZE={max_rows}."), 413
+    if n_rows == 0:
+        return jsonify(mode=mode, count=0, predictions=[])
+
+    try:
+        df = frame_from_payload(payload)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    del payload
+
+    n_rows = len(df)
+    chunk_size = max(1, app.config["BATCH_CHUNK_SIZE"])
+    scoring_mode = mode
+    try:
+        first = score_frame(df.iloc[:chunk_size])
+    except Exception as e:
+        print(f"Batch scoring error: {e}")
+        return jsonify(error=f"Prediction failed: {e}"), 502 if scoring_mode == "mlflow" else 500
+
+    def generate():
+        yield f'{{"mode": "{scoring_mode}", "count": {n_rows}, "predictions": ['
+        yield json.dumps(first.tolist())[1:-1]
+        for start in range(chunk_size, n_rows, chunk_size):
+            try:
+                preds = score_frame(df.iloc[start:start + chunk_size])
+            except Exception as e:
+                print(f"Batch scoring error after {start} rows: {e}")
+                yield f'], "error": {json.dumps(f"Prediction failed after {start} rows: {e}")}}}'
+                return
+            yield "," + json.dumps(preds.tolist())[1:-1]
+        yield "]}"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Readiness probe: 200 once a model can serve requests, 503 before (or if none loads)."""
+    body = health_status()
+    return jsonify(body), 200 if body["ready"] else 503
+
 
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
@@ -0,0 +1,248 @@
+"""
+ASGI entry point for the Retail Price Optimization app.
+
+Serves the same routes as app.py (the form on "/", the JSON batch API on
+"/predict/batch" and the /health readiness probe) with Starlette, reusing
+app.py's model loading, preprocessing and scoring helpers. Calls to the
+MLflow service go through one pooled, keep-alive httpx.AsyncClient per
+worker, so a slow service call only parks a coroutine instead of blocking
+a worker; CPU-bound local predict calls run in a thread pool. Run several
+worker processes with:
+
+    python asgi.py --workers 4
+    # or: uvicorn asgi:app --workers 4 --port 5000
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+
+import app as core
+from serving.batcher import MicroBatcher
+from serving.transport import decode_predictions, encode_frame
+
+# Connections kept to the MLflow service per worker process
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+# Threads running local predict calls per worker process
+PREDICT_THREADS = int(os.getenv("PREDICT_THREADS", str(min(32, (os.cpu_count() or 1) + 4))))
+
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
+
+http_client = None
+batcher = None
+predict_pool = None
+event_loop = None
+
+
+async def service_predict_async(df: pd.DataFrame) -> np.ndarray:
+    """One call to the MLflow scoring server over the pooled client; returns a 1-D float array."""
+    body = b'{"dataframe_split": ' + encode_frame(df, "json") + b"}"
+    response = await http_client.post(
+        core.model_service.prediction_url, content=body, headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    return decode_predictions(response.content, "json")
+
+
+async def run_local(fn, *args):
+    """Runs a CPU-bound call in the predict thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(predict_pool, fn, *args)
+
+
+async def score_frame_async(df: pd.DataFrame) -> np.ndarray:
+    """Async counterpart of app.score_frame."""
+    if core.mode == "mlflow":
+        return await service_predict_async(df)
+    if core.mode == "local":
+        return await run_local(core.score_frame, df)
+    raise RuntimeError("No model available (MLflow or Local).")
+
+
+async def predict_form_async(form) -> float:
+    """
+    Async counterpart of app.predict_form.
+
+    The compiled linear path costs microseconds and runs inline; other local
+    models run in the thread pool. In MLflow mode the row joins a micro-batch
+    whose service call is made by the pooled async client.
+    """
+    if core.mode == "local":
+        if core.fast_scorer is not None:
+            return core.fast_scorer.predict_one(form)
+        return await run_local(core.predict_form, form)
+
+    row = core.form_row(form)
+    coalescer = service_batcher()
+    if coalescer is not None:
+        preds = await asyncio.wrap_future(coalescer.submit_async(row))
+        return float(preds[0])
+    return float((await service_predict_async(pd.DataFrame([row], columns=core.predictors)))[0])
+
+
+def service_batcher():
+    """
+    The micro-batcher for MLflow mode, created on first use.
+
+    With LAZY_STARTUP=1 the service can be found after the worker started,
+    so the batcher isn't built in the lifespan. Only called on the event
+    loop, so there is no race creating it.
+    """
+    global batcher
+    if batcher is None and core.mode == "mlflow" and core.app.config["MICROBATCH"]:
+        # Batches are assembled on the batcher's threads and sent by the event loop's client
+        batcher = MicroBatcher(
+            lambda X: asyncio.run_coroutine_threadsafe(
+                service_predict_async(pd.DataFrame(X, columns=core.predictors)), event_loop
+            ).result(),
+            max_rows=core.app.config["MICROBATCH_MAX_ROWS"],
+            max_wait_ms=core.app.config["MICROBATCH_MAX_WAIT_MS"],
+        )
+    return batcher
+
+
+async def home(request: Request):
+    prediction = None
+
+    if request.method == "POST":
+        if core.mode == "none":
+            prediction = "Error: No model available (MLflow or Local)."
+        else:
+            try:
+                pred = await predict_form_async(await request.form())
+                prediction = f"Predicted Sales Quantity: {pred:.2f} (Mode: {core.mode})"
+            except Exception as e:
+                prediction = f"Prediction Error: {e}"
+
+    return templates.TemplateResponse(
+        request,
+        "index.html",
+        {"prediction": prediction, "predictors": core.predictors, "text_fields": core.text_fields},
+    )
+
+
+async def predict_batch(request: Request):
+    """
+    JSON batch scoring API (same contract and limits as app.py's /predict/batch).
+
+    Parsing and local scoring run in the thread pool. The first chunk is
+    scored before the response starts; the remaining BATCH_CHUNK_SIZE chunks
+    are scored one after another and streamed back.
+    """
+    if core.mode == "none":
+        return JSONResponse({"error": "No model available (MLflow or Local)."}, status_code=503)
+
+    max_bytes = core.app.config["MAX_BATCH_BYTES"]
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        return JSONResponse({"error": f"Request body of {declared} bytes exceeds MAX_BATCH_BYTES={max_bytes}."},
+                            status_code=413)
+    body = bytearray()
+    async for part in request.stream():
+        body += part
+        if len(body) > max_bytes:
+            return JSONResponse({"error": f"Request body exceeds MAX_BATCH_BYTES={max_bytes}."}, status_code=413)
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return JSONResponse({"error": "Request body must be JSON."}, status_code=400)
+    del body
+    try:
+        n_rows = core.payload_rows(payload)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    max_rows = core.app.config["MAX_BATCH_SIZE"]
+    if n_rows > max_rows:
+        return JSONResponse({"error": f"Batch of {n_rows} rows exceeds MAX_BATCH_SIZE={max_rows}."}, status_code=413)
+    if n_rows == 0:
+        return JSONResponse({"mode": core.mode, "count": 0, "predictions": []})
+
+    try:
+        df = await run_local(core.frame_from_payload, payload)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    del payload
+
+    n_rows = len(df)
+    chunk_size = max(1, core.app.config["BATCH_CHUNK_SIZE"])
+    scoring_mode = core.mode
+    try:
+        first = await score_frame_async(df.iloc[:chunk_size])
+    except Exception as e:
+        print(f"Batch scoring error: {e}")
+        return JSONResponse({"error": f"Prediction failed: {e}"}, status_code=502 if scoring_mode == "mlflow" else 500)
+
+    async def generate():
+        yield f'{{"mode": "{scoring_mode}", "count": {n_rows}, "predictions": ['
+        yield json.dumps(first.tolist())[1:-1]
+        for start in range(chunk_size, n_rows, chunk_size):
+            try:
+                preds = await score_frame_async(df.iloc[start:start + chunk_size])
+            except Exception as e:
+                print(f"Batch scoring error after {start} rows: {e}")
+                yield f'], "error": {json.dumps(f"Prediction failed after {start} rows: {e}")}}}'
+                return
+            yield "," + json.dumps(preds.tolist())[1:-1]
+        yield "]}"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+
+async def health(request: Request):
+    """Readiness probe (see app.health_status)."""
+    body = core.health_status()
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app):
+    """Per-worker resources: the HTTP connection pool and the predict threads; closes the micro-batcher on shutdown."""
+    global http_client, batcher, predict_pool, event_loop
+    event_loop = asyncio.get_running_loop()
+    http_client = httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+    )
+    predict_pool = ThreadPoolExecutor(max_workers=PREDICT_THREADS, thread_name_prefix="predict")
+    try:
+        yield
+    finally:
+        if batcher is not None:
+            await asyncio.to_thread(batcher.close)
+            batcher = None
+        await http_client.aclose()
+        predict_pool.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route("/", home, methods=["GET", "POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Worker processes (each loads the model and opens its own connection pool)")
+    args = parser.parse_args()
+    uvicorn.run("asgi:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,75 @@
+"""
+Benchmark the micro-batching coalescer used in front of the MLflow service.
+
+Simulates a prediction service with a fixed per-call round trip (plus a
+small per-row cost) and a limited number of workers (run_pipeline deploys
+with 3), and compares concurrent single-row requests sent one
+call each against the same requests coalesced by MicroBatcher.
+
+Usage:
+    python benchmarks/bench_microbatch.py --clients 64 --requests 2000 --latency-ms 20
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serving.batcher import MicroBatcher  # noqa: E402
+
+
+def make_service(latency_ms: float, per_row_us: float, n_features: int, workers: int):
+    coef = np.random.default_rng(0).normal(size=n_features)
+    slots = threading.Semaphore(workers)
+
+    def predict(X: np.ndarray) -> np.ndarray:
+        with slots:
+            time.sleep(latency_ms / 1000.0 + per_row_us * len(X) / 1e6)
+        return X @ coef
+
+    return predict
+
+
+def run(label: str, call, clients: int, requests: int, n_features: int):
+    rows = np.random.default_rng(1).normal(size=(requests, n_features))
+    latencies = np.empty(requests)
+
+    def one(i):
+        start = time.perf_counter()
+        call(rows[i])
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies * 1e3, [50, 99])
+    print(f"{label:<12} {requests / elapsed:>9.0f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms")
+
+
+def main(clients: int, requests: int, latency_ms: float, workers: int, max_rows: int, max_wait_ms: float):
+    n_features = 29
+    service = make_service(latency_ms, per_row_us=5.0, n_features=n_features, workers=workers)
+    run("per-request", lambda row: service(np.atleast_2d(row)), clients, requests, n_features)
+    batcher = MicroBatcher(service, max_rows=max_rows, max_wait_ms=max_wait_ms)
+    run("micro-batch", batcher.submit, clients, requests, n_features)
+    print(f"{batcher.rows} rows in {batcher.batches} service calls")
+    batcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--service-workers", type=int, default=3)
+    parser.add_argument("--max-rows", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    main(args.clients, args.requests, args.latency_ms, args.service_workers, args.max_rows, args.max_wait_ms)
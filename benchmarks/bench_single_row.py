@@ -0,0 +1,65 @@
+"""
+Benchmark single-row scoring latency in app.py.
+
+Compares the DataFrame + sklearn path against the compiled linear fast path
+on the same form submission and prints p50/p99 latencies.
+
+Usage:
+    python benchmarks/bench_single_row.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app  # noqa: E402
+
+
+def time_calls(fn, form, iterations: int) -> np.ndarray:
+    """Returns per-call latencies in microseconds."""
+    for _ in range(min(iterations, 200)):  # warm-up
+        fn(form)
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(form)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def main(iterations: int):
+    if app.mode != "local" or app.fast_scorer is None:
+        print(f"Fast path unavailable (mode={app.mode}); a local linear model.pkl is required.")
+        return
+
+    # Form values as the browser sends them: strings, some left empty
+    form = {col: str(i + 1.5) for i, col in enumerate(app.predictors)}
+    form[app.predictors[-1]] = ""
+
+    scorer = app.fast_scorer
+    try:
+        app.fast_scorer = None
+        baseline_pred = app.predict_form(form)
+        baseline = time_calls(app.predict_form, form, iterations)
+    finally:
+        app.fast_scorer = scorer
+    fast_pred = app.predict_form(form)
+    fast = time_calls(app.predict_form, form, iterations)
+
+    print(f"Predictions: dataframe={baseline_pred:.6f} fast={fast_pred:.6f}")
+    print(f"{'path':<12}{'p50 (us)':>12}{'p99 (us)':>12}")
+    for name, t in (("dataframe", baseline), ("fast", fast)):
+        print(f"{name:<12}{np.percentile(t, 50):>12.1f}{np.percentile(t, 99):>12.1f}")
+    print(f"p50 speedup: {np.percentile(baseline, 50) / np.percentile(fast, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
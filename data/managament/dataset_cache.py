@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from data.managament.schema import apply_dtypes
+
+# Bump when the on-disk layout changes
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), ".cache", "datasets")
+
+
+def schema_version(table_name: str) -> str:
+    """
+    Fingerprint of the ORM definition of a table (column names and types).
+
+    Changing a column in data/managament/index.py changes the version, which
+    changes every cache key for that table.
+    """
+    try:
+        from data.managament.index import Base
+    except Exception:
+        return "unknown"
+    table = Base.metadata.tables.get(table_name)
+    if table is None:
+        return "unknown"
+    spec = [(c.name, str(c.type)) for c in table.columns]
+    return hashlib.sha1(json.dumps(spec).encode()).hexdigest()[:12]
+
+
+def change_signal(engine: Engine, table_name: str) -> dict:
+    """
+    Cheap evidence that a table was written to, including in-place updates.
+
+    PostgreSQL: the table's insert/update/delete counters from
+    pg_stat_user_tables (reported when a writing transaction ends, so they
+    can trail a commit by up to a second). File-backed SQLite: the database
+    file's mtime and size, which change on any write to any table. Other
+    engines return {}; use table_checksum there for in-place updates.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables "
+                     "WHERE relid = to_regclass(:table)"),
+                {"table": table_name},
+            ).first()
+        return {} if row is None else {"n_tup_ins": int(row[0]), "n_tup_upd": int(row[1]), "n_tup_del": int(row[2])}
+    database = engine.url.database
+    if engine.dialect.name == "sqlite" and database and database != ":memory:" and os.path.exists(database):
+        stat = os.stat(database)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    return {}
+
+
+def table_checksum(engine: Engine, table_name: str, id_column: str = "id", batch_rows: int = 10_000) -> str:
+    """
+    Hash of every row of a table, in `id_column` order.
+
+    PostgreSQL computes it server side (md5 over each row's text form), so
+    only the digest crosses the network; other engines stream the rows in
+    batches of `batch_rows` and hash them locally.
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    table, key = quote(table_name), quote(id_column)
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            digest = conn.execute(
+                text(f"SELECT md5(string_agg(md5(t::text), '' ORDER BY t.{key})) FROM {table} AS t")
+            ).scalar()
+            return digest or ""
+        h = hashlib.sha256()
+        result = conn.execution_options(stream_results=True).execute(text(f"SELECT * FROM {table} ORDER BY {key}"))
+        for rows in result.partitions(batch_rows):
+            h.update(repr([tuple(row) for row in rows]).encode())
+        return h.hexdigest()
+
+
+class DatasetCache:
+    """
+    Local Arrow IPC copies of database query results.
+
+    Entries are keyed by table name + query hash + schema version and read
+    back through a memory map, so repeat loads avoid the database and most
+    copies. An entry is invalidated when the table's row count, max id or
+    change_signal changes, and with checksum=True when any row's contents change.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, validate: bool = True, checksum: bool = False):
+        """
+        Args:
+            cache_dir: Directory holding the .arrow files and their metadata.
+            validate: Check row count / max id against the database before
+                serving an entry. Disable to trust the cache without any DB round trip.
+            checksum: Also compare a checksum of the table's contents, for
+                engines whose change_signal can't see in-place updates.
+                Costs a scan of the table on every validation.
+        """
+        self.cache_dir = cache_dir
+        self.validate = validate
+        self.checksum = checksum
+
+    def key(self, table_name: str, query: str, dtypes: Optional[Dict[str, str]] = None) -> str:
+        """Cache key for a query against a table (and the dtypes it is stored with)."""
+        dtype_spec = json.dumps(dtypes, sort_keys=True) if dtypes else ""
+        digest = hashlib.sha1(
+            f"{CACHE_FORMAT_VERSION}|{schema_version(table_name)}|{query}|{dtype_spec}".encode()
+        ).hexdigest()[:16]
+        return f"{table_name}-{digest}"
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.cache_dir, f"{key}.arrow"), os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def fingerprint(engine: Engine, table_name: str, id_column: str = "id", checksum: bool = False) -> dict:
+        """
+        Row count, max id and change_signal of a table; one cheap round trip.
+
+        With checksum=True the table_checksum of its contents is included too,
+        for engines without a change signal. It scans the whole table.
+        """
+        quote = engine.dialect.identifier_preparer.quote
+        with engine.connect() as conn:
+            row_count, max_id = conn.execute(
+                text(f"SELECT COUNT(*), MAX({quote(id_column)}) FROM {quote(table_name)}")
+            ).one()
+        result = {"row_count": int(row_count), "max_id": None if max_id is None else str(max_id)}
+        result.update(change_signal(engine, table_name))
+        if checksum:
+            result["checksum"] = table_checksum(engine, table_name, id_column)
+        return result
+
+    def read_table(
+        self,
+        engine: Engine,
+        table_name: str,
+        query: Optional[str] = None,
+        id_column: str = "id",
+        dtypes: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Returns the query result as a memory-mapped pyarrow.Table, fetching it on a miss.
+
+        Args:
+            engine: SQLAlchemy engine used on a miss (and for validation).
+            table_name: Table the query reads; used for the key and invalidation.
+            query: SQL to cache (defaults to SELECT * FROM table_name).
+            id_column: Column whose max is part of the invalidation fingerprint.
+            dtypes: Schema dtype map (see schema.dtype_map) applied before the
+                result is stored, so cached files are already compact.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required for the dataset cache.") from e
+
+        query = query or f"SELECT * FROM {table_name}"
+        data_path, meta_path = self._paths(self.key(table_name, query, dtypes))
+
+        current = self.fingerprint(engine, table_name, id_column, self.checksum) if self.validate else None
+        if os.path.exists(data_path) and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if current is None or meta.get("fingerprint") == current:
+                return pa.ipc.open_file(pa.memory_map(data_path, "r")).read_all()
+
+        df = pd.read_sql(text(query), engine)
+        if dtypes:
+            df = apply_dtypes(df, dtypes)
+        if current is None:
+            current = self.fingerprint(engine, table_name, id_column, self.checksum)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with pa.OSFile(data_path + ".tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path, "w") as f:
+            json.dump({"table": table_name, "query": query, "fingerprint": current, "created_at": time.time()}, f)
+        return pa.ipc.open_file(pa.memory_map(data_path, "r")).read_all()
+
+    def get(
+        self,
+        engine: Engine,
+        table_name: str,
+        query: Optional[str] = None,
+        id_column: str = "id",
+        dtypes: Optional[Dict[str, str]] = None,
+    ) -> pd.DataFrame:
+        """Same as read_table, converted to pandas without consolidating columns into blocks."""
+        return self.read_table(engine, table_name, query, id_column, dtypes).to_pandas(split_blocks=True)
+
+    def invalidate(self, table_name: Optional[str] = None) -> int:
+        """Deletes cached entries (for one table, or all). Returns the number removed."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".arrow") and (table_name is None or name.startswith(f"{table_name}-")):
+                for path in (os.path.join(self.cache_dir, name), os.path.join(self.cache_dir, name[:-6] + ".json")):
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed += 1
+        return removed
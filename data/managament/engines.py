@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+load_dotenv(os.path.join(os.path.dirname(__file__), "../../.env"))
+
+# Pool settings previously hard-coded in index.py
+POSTGRES_ENGINE_OPTIONS = dict(
+    pool_size=5,
+    max_overflow=-1,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    connect_args={
+        "connect_timeout": 60,
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 5,
+    },
+)
+
+_engines: Dict[str, Engine] = {}
+_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+
+
+def _key(url: str, options: dict) -> str:
+    return f"{url}|{sorted(options.items())!r}"
+
+
+def get_engine(url: Optional[str] = None, **options) -> Engine:
+    """
+    Returns the shared engine for a database URL, creating it on first use.
+
+    Engines are pooled and reused across ingest_data, the retriever and the
+    loaders instead of being rebuilt per call. SQL statement logging is off
+    unless SQL_ECHO=1.
+
+    Args:
+        url: Database URL (defaults to the DB_URL environment variable).
+        **options: Extra create_engine options; engines with different options
+            are kept separately (e.g. isolation_level="AUTOCOMMIT").
+    """
+    url = url or os.getenv("DB_URL")
+    if not url:
+        raise ValueError("DB_URL environment variable is not set. Please set it in .env file.")
+    url = str(url)
+
+    key = _key(url, options)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            kwargs = {"echo": os.getenv("SQL_ECHO", "0") == "1"}
+            parsed = make_url(url)
+            if parsed.get_backend_name() == "postgresql":
+                kwargs.update(POSTGRES_ENGINE_OPTIONS, poolclass=TimedQueuePool)
+            elif parsed.get_backend_name() != "sqlite" or parsed.database not in (None, "", ":memory:"):
+                kwargs["poolclass"] = TimedQueuePool
+            kwargs.update(options)
+            engine = create_engine(url, **kwargs)
+            _engines[key] = engine
+    return engine
+
+
+def pool_metrics(url: Optional[str] = None, **options) -> dict:
+    """
+    Connection pool counters for a registered engine.
+
+    Returns:
+        dict: size, checked_in, checked_out, overflow, checkouts and
+        wait_time_total_s / wait_time_max_s spent waiting for a connection.
+    """
+    engine = get_engine(url, **options)
+    pool = engine.pool
+    metrics = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        metrics.update(
+            checkouts=pool.checkouts,
+            wait_time_total_s=pool.wait_time_total,
+            wait_time_max_s=pool.wait_time_max,
+        )
+    return metrics
+
+
+def dispose_all():
+    """Closes every pooled connection and forgets the registered engines."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -1,13 +1,17 @@
+import argparse
+import io
 import os
 import sys
+import time
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from data.managament.index import Base, RetailPrices
+from sqlalchemy import bindparam, select, text, tuple_
+from data.managament import schema
+from data.managament.engines import get_engine
+from data.managament.index import RETAIL_PRICES_ID_DEFAULT, Base, RetailPrices
 # We need to construct the engine dynamically
 from dotenv import load_dotenv
 
@@ -25,7 +29,7 @@ def create_database_if_not_exists(db_url):
     # Replace dbname with 'postgres' in the URL
     postgres_url = url.set(database='postgres')
     
-    engine = create_engine(postgres_url, isolation_level="AUTOCOMMIT")
+    engine = get_engine(postgres_url.render_as_string(hide_password=False), isolation_level="AUTOCOMMIT")
     
     with engine.connect() as conn:
         result = conn.execute(text(f"SELECT 1 FROM pg_database WHERE datname = '{db_name}'"))
@@ -36,63 +40,196 @@ def create_database_if_not_exists(db_url):
         else:
             print(f"Database '{db_name}' already exists.")
 
-def fill_table():
-    """Reads CSV and populates the retail_prices table."""
+NATURAL_KEY = ("product_id", "month_year")
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def read_csv_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Streams the CSV in chunks shaped like the retail_prices table.
+
+    Parsing goes through schema.read_csv_chunks at full precision; columns
+    the table doesn't have (and id) are dropped.
+    """
+    model_columns = [c.key for c in RetailPrices.__table__.columns if c.key != 'id']
+    for chunk in schema.read_csv_chunks(csv_path, chunksize, precision="full"):
+        yield chunk[[c for c in model_columns if c in chunk.columns]]
+
+
+def copy_chunk(cursor, table_name, chunk):
+    """
+    COPY one chunk into a table through an in-memory CSV buffer.
+
+    `cursor` is a psycopg2 cursor of a raw connection; the chunk's columns
+    must be columns of the table. Committing is left to the caller.
+    """
+    buf = io.StringIO()
+    chunk.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    cols = ", ".join(chunk.columns)
+    cursor.copy_expert(f"COPY {table_name} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def upsert_statements(target, columns):
+    """
+    UPDATE and INSERT that merge staging_<target> into `target` on NATURAL_KEY.
+
+    Matching rows are updated in place (ids stay stable); keys that weren't
+    there are inserted, with id left to the column's nextval() default.
+    """
+    key_match = " AND ".join(f"t.{k} = s.{k}" for k in NATURAL_KEY)
+    updates = ", ".join(f"{c} = s.{c}" for c in columns if c not in NATURAL_KEY)
+    cols = ", ".join(columns)
+    return (
+        f"UPDATE {target} t SET {updates} FROM staging_{target} s WHERE {key_match}",
+        f"INSERT INTO {target} ({cols}) SELECT {', '.join('s.' + c for c in columns)} "
+        f"FROM staging_{target} s WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {key_match})",
+    )
+
+
+def _load_postgres(engine, chunks, mode):
+    """Loads chunks with COPY FROM STDIN; upserts go through a temp staging table."""
+    target = RetailPrices.__tablename__
+    rows = 0
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        # Tables created before id had a server default can't take COPY without id
+        cursor.execute(str(RETAIL_PRICES_ID_DEFAULT.compile(dialect=engine.dialect)))
+        if mode == "upsert":
+            # Without id, so staged rows don't draw sequence values or violate its NOT NULL
+            cursor.execute(f"CREATE TEMP TABLE staging_{target} (LIKE {target}) ON COMMIT DROP")
+            cursor.execute(f"ALTER TABLE staging_{target} DROP COLUMN id")
+        columns = None
+        for chunk in chunks:
+            columns = list(chunk.columns)
+            copy_chunk(cursor, f"staging_{target}" if mode == "upsert" else target, chunk)
+            rows += len(chunk)
+
+        if mode == "upsert" and columns:
+            for statement in upsert_statements(target, columns):
+                cursor.execute(statement)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return rows
+
+
+def _load_executemany(engine, chunks, mode):
+    """Fallback for non-PostgreSQL engines (e.g. SQLite for local testing)."""
+    table = RetailPrices.__table__
+    rows = 0
+    with engine.begin() as conn:
+        for chunk in chunks:
+            rows += len(chunk)
+            if mode == "upsert":
+                key_cols = [table.c[k] for k in NATURAL_KEY]
+                keys = list(chunk[list(NATURAL_KEY)].astype(object).itertuples(index=False, name=None))
+                existing = conn.execute(
+                    select(table.c.id, *key_cols).where(tuple_(*key_cols).in_(keys))
+                ).fetchall()
+                existing = pd.DataFrame(existing, columns=["id", *NATURAL_KEY])
+                existing = existing.astype({k: chunk[k].dtype for k in NATURAL_KEY})
+                chunk = chunk.merge(existing, on=list(NATURAL_KEY), how="left")
+                matched = chunk["id"].notna()
+                if matched.any():
+                    updates = chunk[matched].astype(object).where(chunk[matched].notna(), None)
+                    conn.execute(
+                        table.update()
+                        .where(table.c.id == bindparam("b_id"))
+                        .values({c: bindparam(f"b_{c}") for c in chunk.columns if c != "id"}),
+                        updates.rename(columns=lambda c: f"b_{c}").to_dict(orient="records"),
+                    )
+                chunk = chunk[~matched].drop(columns=["id"])
+            if len(chunk):
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                conn.execute(table.insert(), chunk.to_dict(orient="records"))
+    return rows
+
+
+def bulk_load_csv(engine, csv_path, mode="append", chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Streams a CSV into retail_prices.
+
+    PostgreSQL uses COPY FROM STDIN chunk by chunk; other engines fall back to
+    executemany inserts.
+
+    Args:
+        engine: SQLAlchemy engine for the target database.
+        csv_path: Path of the CSV extract.
+        mode: "append" inserts every row, "upsert" updates rows matching the
+            natural key (product_id, month_year) and inserts the rest.
+        chunksize: Rows per chunk read from the CSV.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    if mode not in ("append", "upsert"):
+        raise ValueError(f"Unknown load mode: {mode}")
+
+    start = time.perf_counter()
+    chunks = read_csv_chunks(csv_path, chunksize=chunksize)
+    if engine.dialect.name == "postgresql":
+        rows = _load_postgres(engine, chunks, mode)
+    else:
+        rows = _load_executemany(engine, chunks, mode)
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {rows} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s, mode={mode}).")
+    return rows
+
+
+def fill_table(mode="skip", chunksize=DEFAULT_CHUNKSIZE, csv_path=None):
+    """
+    Reads CSV and populates the retail_prices table.
+
+    Args:
+        mode: "skip" loads only into an empty table, "append" always inserts,
+            "upsert" updates/inserts on (product_id, month_year).
+        chunksize: Rows per COPY chunk.
+        csv_path: CSV to load (defaults to data/retail_price.csv).
+    """
     db_url = os.getenv("DB_URL")
     if not db_url:
         print("Error: DB_URL not found in environment.")
         return
 
-    create_database_if_not_exists(db_url)
+    if db_url.startswith("postgresql"):
+        create_database_if_not_exists(db_url)
     
     # Now connect to the actual DB
-    engine = create_engine(db_url)
+    engine = get_engine(db_url)
     
-    csv_path = os.path.join(os.path.dirname(__file__), "../retail_price.csv")
+    csv_path = csv_path or os.path.join(os.path.dirname(__file__), "../retail_price.csv")
     
     if not os.path.exists(csv_path):
         print(f"Error: CSV file not found at {csv_path}")
         return
 
-    print(f"Reading data from {csv_path}...")
-    df = pd.read_csv(csv_path)
-
-    # Standardize column names
-    df.columns = [c.lower().replace(" ", "_") for c in df.columns]
-    
     # Create tables
     Base.metadata.create_all(engine)
-    
-    Session = sessionmaker(bind=engine)
-    session = Session()
 
     try:
-        # Check if data exists
-        if session.query(RetailPrices).first():
-            print("Table already has data. Skipping insertion.")
-            session.close()
-            return
-
-        print("Inserting records...")
-        
-        # Convert DataFrame to list of dicts for bulk insert
-        model_columns = [c.key for c in RetailPrices.__table__.columns if c.key != 'id']
-        
-        # Filter df to available columns
-        available_cols = [c for c in model_columns if c in df.columns]
-        df_subset = df[available_cols]
-        
-        records = df_subset.to_dict(orient='records')
-        
-        session.bulk_insert_mappings(RetailPrices, records)
-        session.commit()
-        print(f"Successfully inserted {len(records)} records.")
-        
+        if mode == "skip":
+            with engine.connect() as conn:
+                if conn.execute(select(RetailPrices.__table__.c.id).limit(1)).first():
+                    print("Table already has data. Skipping insertion.")
+                    return
+            mode = "append"
+
+        print(f"Loading data from {csv_path}...")
+        bulk_load_csv(engine, csv_path, mode=mode, chunksize=chunksize)
+
     except Exception as e:
-        session.rollback()
         print(f"Error occurred: {e}")
-    finally:
-        session.close()
 
 if __name__ == "__main__":
-    fill_table()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["skip", "append", "upsert"], default="skip",
+                        help="skip: only load an empty table; append: insert all rows; upsert: on (product_id, month_year)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--csv", default=None, help="CSV to load (defaults to data/retail_price.csv)")
+    args = parser.parse_args()
+    fill_table(mode=args.mode, chunksize=args.chunksize, csv_path=args.csv)
@@ -1,42 +1,33 @@
-import os
-
-from dotenv import load_dotenv
-from sqlalchemy import Column, Date, DateTime, Integer, Numeric, String, create_engine
+from sqlalchemy import Column, Date, DateTime, Integer, Numeric, String
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import QueuePool
 
-load_dotenv(os.path.join(os.path.dirname(__file__), "../../.env"))
+from data.managament.engines import get_engine
 
+_session_factory = None
 
 
-engine = create_engine(
-    os.getenv("DB_URL"),
-    echo=True,
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=-1,
-    pool_recycle=3600,
-    pool_pre_ping=True,
-    connect_args={
-        "connect_timeout": 60,
-        "keepalives": 1,
-        "keepalives_idle": 30,
-        "keepalives_interval": 10,
-        "keepalives_count": 5,
-    },
-)
-Session = sessionmaker(bind=engine)
+def __getattr__(name):
+    """Lazily exposes the shared `engine` and `Session` (see engines.get_engine)."""
+    global _session_factory
+    if name == "engine":
+        return get_engine()
+    if name == "Session":
+        if _session_factory is None:
+            _session_factory = sessionmaker(bind=get_engine())
+        return _session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
-from sqlalchemy import Column, Sequence, SmallInteger, String
+from sqlalchemy import DDL, Column, Sequence, SmallInteger, String, event
 
 Base = declarative_base()
 
 
 class RetailPrices(Base):
     __tablename__ = "retail_prices"
-    id = Column(SmallInteger, Sequence("retail_prices_id_seq"), primary_key=True)
+    # SQLite only autoincrements INTEGER primary keys (local testing of the loaders)
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"), Sequence("retail_prices_id_seq"), primary_key=True)
     product_id = Column(String)
     product_category_name = Column(String)
     month_year = Column(DateTime)
@@ -69,6 +60,14 @@ class RetailPrices(Base):
     lag_price = Column(Numeric(precision=23, scale=15))
 
 
+# COPY and INSERT ... SELECT don't go through SQLAlchemy, so PostgreSQL has to
+# fill id itself. SQLite can't render nextval(), hence DDL instead of server_default.
+RETAIL_PRICES_ID_DEFAULT = DDL(
+    "ALTER TABLE retail_prices ALTER COLUMN id SET DEFAULT nextval('retail_prices_id_seq')"
+)
+event.listen(RetailPrices.__table__, "after_create", RETAIL_PRICES_ID_DEFAULT.execute_if(dialect="postgresql"))
+
+
 class RetailPriceProcessed(Base): 
     __tablename__ = "retail_prices_processed"
     id = Column(SmallInteger, Sequence("retail_prices_processed_id_seq"), primary_key=True)
@@ -77,4 +76,12 @@ class RetailPriceProcessed(Base):
     customers = Column(SmallInteger)
     s = Column(Numeric(precision=23, scale=15))
     comp_2 = Column(Numeric(precision=23, scale=15))
-    qty = Column(SmallInteger)
\ No newline at end of file
+    qty = Column(SmallInteger)
+
+class RetailPricePredictions(Base):
+    __tablename__ = "retail_price_predictions"
+    # One row per scored retail_prices row per batch run
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    model_version = Column(String, primary_key=True)
+    scored_at = Column(DateTime, primary_key=True)
+    predicted_qty = Column(Numeric(precision=23, scale=15))
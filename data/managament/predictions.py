@@ -0,0 +1,68 @@
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy.engine import Engine
+
+from data.managament.fill_table import copy_chunk
+from data.managament.index import RetailPricePredictions
+
+PREDICTION_COLUMNS = ["id", "predicted_qty", "model_version", "scored_at"]
+
+
+class PredictionWriter:
+    """
+    Bulk-writes prediction chunks into retail_price_predictions.
+
+    PostgreSQL streams each chunk with COPY FROM STDIN on one raw connection;
+    other engines (SQLite for local testing) fall back to executemany
+    inserts. Everything written inside the `with` block is one transaction,
+    so a failed run leaves no partial results behind.
+
+    Usage:
+        with PredictionWriter(engine) as writer:
+            writer.write(frame)  # columns: id, predicted_qty, model_version, scored_at
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.table = RetailPricePredictions.__table__
+        self.rows = 0
+        self._raw = None
+        self._cursor = None
+        self._conn = None
+        self._transaction = None
+
+    def __enter__(self) -> "PredictionWriter":
+        self.table.create(self.engine, checkfirst=True)
+        if self.engine.dialect.name == "postgresql":
+            self._raw = self.engine.raw_connection()
+            self._cursor = self._raw.cursor()
+        else:
+            self._conn = self.engine.connect()
+            self._transaction = self._conn.begin()
+        return self
+
+    def write(self, frame: pd.DataFrame) -> int:
+        """Writes one chunk of predictions. Returns the number of rows written."""
+        if frame.empty:
+            return 0
+        frame = frame[PREDICTION_COLUMNS]
+        if self._cursor is not None:
+            copy_chunk(self._cursor, self.table.name, frame)
+        else:
+            self._conn.execute(self.table.insert(), frame.astype(object).to_dict(orient="records"))
+        self.rows += len(frame)
+        return len(frame)
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        if self._raw is not None:
+            try:
+                self._raw.commit() if exc_type is None else self._raw.rollback()
+            finally:
+                self._raw.close()
+        else:
+            try:
+                self._transaction.commit() if exc_type is None else self._transaction.rollback()
+            finally:
+                self._conn.close()
+        return None
@@ -5,12 +5,21 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")
 
 import pandas as pd
 from sqlalchemy.orm import Session
-from data.managament.index import engine, RetailPrices
+from data.managament.engines import get_engine
+from data.managament.index import RetailPrices
+from data.managament.schema import apply_dtypes, dtype_map
+from data.managament.dataset_cache import DatasetCache
 
-def get_latest_data():
+def get_latest_data(use_cache: bool = False, precision: str = "compact"):
     """
     Fetches all data from the retail_prices table.
 
+    Args:
+        use_cache: Serve from the local Arrow dataset cache (memory-mapped),
+            only hitting the table when its row count or max id changed.
+        precision: "compact" casts to float32/int16/category on read,
+            "full" keeps NUMERIC columns as float64.
+
     Returns:
         pd.DataFrame: DataFrame containing the retail prices data.
     """
@@ -18,8 +27,12 @@ def get_latest_data():
         # Use pandas read_sql for efficient DataFrame creation
         # We query the entire table as per the user's apparent requirement for "filling the table" context
         query = "SELECT * FROM retail_prices"
+        engine = get_engine()
+        dtypes = dtype_map(RetailPrices, precision)
+        if use_cache:
+            return DatasetCache().get(engine, RetailPrices.__tablename__, query, dtypes=dtypes)
         df = pd.read_sql(query, engine)
-        return df
+        return apply_dtypes(df, dtypes)
     except Exception as e:
         print(f"Error retrieving data: {e}")
         return pd.DataFrame()
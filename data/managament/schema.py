@@ -0,0 +1,175 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Date, DateTime, Integer, MetaData, Numeric, SmallInteger, String, Table
+from sqlalchemy.engine import Engine
+
+from data.managament.index import Base, RetailPrices
+
+# month_year as it appears in the CSV extract (01-05-2017)
+CSV_DATE_FORMAT = "%d-%m-%Y"
+PRECISIONS = ("compact", "full")
+
+
+def dtype_map(model=RetailPrices, precision: str = "compact") -> Dict[str, str]:
+    """
+    Pandas dtypes for the columns of an ORM model.
+
+    SmallInteger -> int16, Integer -> int32, BigInteger -> int64,
+    Numeric -> float32 (float64 with precision="full"), String -> category,
+    Date/DateTime -> datetime64[ns].
+
+    Args:
+        model: Declarative ORM class (or Table).
+        precision: "compact" or "full" (keeps NUMERIC columns as float64).
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+    table = getattr(model, "__table__", model)
+    dtypes = {}
+    for col in table.columns:
+        t = col.type
+        if isinstance(t, SmallInteger):
+            dtypes[col.key] = "int16"
+        elif isinstance(t, BigInteger):
+            dtypes[col.key] = "int64"
+        elif isinstance(t, Integer):
+            dtypes[col.key] = "int32"
+        elif isinstance(t, Numeric):
+            dtypes[col.key] = "float64" if precision == "full" else "float32"
+        elif isinstance(t, String):
+            dtypes[col.key] = "category"
+        elif isinstance(t, (Date, DateTime)):
+            dtypes[col.key] = "datetime64[ns]"
+    return dtypes
+
+
+def table_dtypes(table_name: str, precision: str = "compact") -> Optional[Dict[str, str]]:
+    """dtype_map for a table defined in index.py, or None for unknown tables."""
+    table = Base.metadata.tables.get(table_name)
+    return dtype_map(table, precision) if table is not None else None
+
+
+def reflect_dtypes(engine: Engine, table_name: str, precision: str = "compact") -> Dict[str, str]:
+    """
+    dtype_map of a table as the database declares it.
+
+    Unlike table_dtypes this works for tables missing from index.py and sees
+    the dialect's actual column types (e.g. INTEGER for ids declared
+    SmallInteger with a SQLite variant).
+    """
+    return dtype_map(Table(table_name, MetaData(), autoload_with=engine), precision)
+
+
+def stream_dtypes(dtypes: Dict[str, str]) -> Dict[str, str]:
+    """
+    Variant of a dtype map whose casts don't depend on the values of a chunk.
+
+    Integer columns map to pandas' nullable Int16/Int32/Int64, so a chunk with
+    nulls stays an integer column and a value that overflows the declared type
+    raises instead of widening the column. Every chunk of a stream then has
+    the same schema.
+    """
+    return {col: dtype.capitalize() if dtype.startswith("int") else dtype for col, dtype in dtypes.items()}
+
+
+def _int_dtype(series: pd.Series, dtype: str) -> str:
+    """The mapped integer dtype, widened if the values don't fit (never wraps around)."""
+    for candidate in ("int16", "int32", "int64"):
+        if np.dtype(candidate).itemsize < np.dtype(dtype).itemsize:
+            continue
+        info = np.iinfo(candidate)
+        if series.empty or (series.min() >= info.min and series.max() <= info.max):
+            return candidate
+    return "int64"
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: Dict[str, str], date_format: Optional[str] = None) -> pd.DataFrame:
+    """
+    Casts the columns of `df` covered by `dtypes` in place.
+
+    Integer columns containing nulls become float32 (float64 for int64), and
+    integers that overflow the mapped type are widened; nullable Int dtypes
+    (see stream_dtypes) are cast as given. Decimal columns are converted
+    numerically before the cast.
+
+    Args:
+        df: DataFrame to cast.
+        dtypes: Column -> dtype (see dtype_map).
+        date_format: strptime format for string dates (e.g. the CSV's dd-mm-yyyy).
+    """
+    for col, dtype in dtypes.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if dtype == "category":
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[col] = series.astype("category")
+        elif dtype.startswith("datetime"):
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                df[col] = pd.to_datetime(series, format=date_format)
+        else:
+            converted = series.dtype == object
+            if converted:
+                series = pd.to_numeric(series)
+            if dtype.startswith("int"):
+                if series.isna().any():
+                    dtype = "float64" if dtype == "int64" else "float32"
+                else:
+                    dtype = _int_dtype(series, dtype)
+            if converted or series.dtype != dtype:
+                df[col] = series.astype(dtype)
+    return df
+
+
+def _csv_dtypes(csv_path: str, dtypes: Dict[str, str]):
+    """
+    Standardized column names of a CSV extract and the dtypes it can be read with.
+
+    Float and category columns are parsed directly into their target dtype;
+    integers are cast after parsing so nulls or out-of-range values can be
+    handled.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    names = {c: c.lower().replace(" ", "_") for c in header}
+    read_dtypes = {
+        raw: dtypes[name]
+        for raw, name in names.items()
+        if name in dtypes and (dtypes[name].startswith("float") or dtypes[name] == "category")
+    }
+    return names, read_dtypes
+
+
+def load_csv(csv_path: str, model=RetailPrices, precision: str = "compact") -> pd.DataFrame:
+    """
+    Reads a CSV extract straight into the compact dtypes of an ORM model.
+
+    Column names are standardized like fill_table does and month_year
+    (dd-mm-yyyy) is parsed to a timestamp.
+    """
+    dtypes = dtype_map(model, precision)
+    names, read_dtypes = _csv_dtypes(csv_path, dtypes)
+    df = pd.read_csv(csv_path, dtype=read_dtypes)
+    df.columns = [names[c] for c in df.columns]
+    return apply_dtypes(df, dtypes, date_format=CSV_DATE_FORMAT)
+
+
+def read_csv_chunks(csv_path: str, chunksize: int, model=RetailPrices, precision: str = "compact"):
+    """
+    Streams a CSV extract in chunks cast like load_csv.
+
+    Integer columns use the nullable stream_dtypes, so every chunk has the
+    same schema whether or not it contains nulls.
+
+    Args:
+        csv_path: Path of the CSV extract.
+        chunksize: Rows per chunk.
+        model: Declarative ORM class (or Table) giving the dtypes.
+        precision: "compact" or "full" (see dtype_map).
+    """
+    dtypes = stream_dtypes(dtype_map(model, precision))
+    names, read_dtypes = _csv_dtypes(csv_path, dtypes)
+    for chunk in pd.read_csv(csv_path, dtype=read_dtypes, chunksize=chunksize):
+        chunk.columns = [names[c] for c in chunk.columns]
+        yield apply_dtypes(chunk, dtypes, date_format=CSV_DATE_FORMAT)
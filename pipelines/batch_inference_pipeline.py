@@ -0,0 +1,42 @@
+from typing import Optional
+
+from zenml import pipeline
+from zenml.config import DockerSettings
+from zenml.integrations.constants import MLFLOW
+
+from steps.batch_predict import batch_predict
+from steps.prediction_service_loader import prediction_service_loader
+
+docker_settings = DockerSettings(required_integrations=[MLFLOW])
+
+@pipeline(enable_cache=False, settings={"docker": docker_settings})
+def batch_inference_pipeline(
+    pipeline_name: str,
+    pipeline_step_name: str,
+    use_service: bool = False,
+    table_name: str = "retail_prices",
+    chunksize: int = 50_000,
+    n_jobs: int = 4,
+    backend: str = "thread",
+    transport: str = "json",
+    prediction_url: Optional[str] = None,
+):
+    """Scores a whole table in chunks and writes the predictions to retail_price_predictions."""
+    service = None
+    if use_service:
+        # Load the deployed model service
+        service = prediction_service_loader(
+            pipeline_name=pipeline_name,
+            pipeline_step_name=pipeline_step_name,
+            running=False,
+        )
+
+    batch_predict(
+        service=service,
+        table_name=table_name,
+        chunksize=chunksize,
+        n_jobs=n_jobs,
+        backend=backend,
+        transport=transport,
+        prediction_url=prediction_url,
+    )
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from zenml import pipeline
 from zenml.config import DockerSettings
 from zenml.integrations.constants import MLFLOW
@@ -12,6 +14,9 @@ docker_settings = DockerSettings(required_integrations=[MLFLOW])
 def inference_pipeline(
     pipeline_name: str,
     pipeline_step_name: str,
+    transport: str = "json",
+    prediction_url: Optional[str] = None,
+    chunk_rows: Optional[int] = None,
 ):
     # Link all the steps together
     # Data ingestion for inference
@@ -25,4 +30,10 @@ def inference_pipeline(
     )
     
     # Run predictions
-    predictor(service=model_deployment_service, data=inference_data)
+    predictor(
+        service=model_deployment_service,
+        data=inference_data,
+        transport=transport,
+        prediction_url=prediction_url,
+        chunk_rows=chunk_rows,
+    )
@@ -4,6 +4,7 @@ from typing import cast
 from zenml.integrations.mlflow.mlflow_utils import get_tracking_uri
 from zenml.client import Client
 
+from pipelines.batch_inference_pipeline import batch_inference_pipeline
 from pipelines.deployment_pipeline import deployment_pipeline
 from pipelines.inference_pipeline import inference_pipeline
 from constants import MODEL_NAME, PIPELINE_NAME, PIPELINE_STEP_NAME
@@ -11,6 +12,9 @@ from constants import MODEL_NAME, PIPELINE_NAME, PIPELINE_STEP_NAME
 def main(
     config: str = "deploy",
     min_accuracy: float = 0.5,
+    chunksize: int = 50_000,
+    n_jobs: int = 4,
+    use_service: bool = False,
 ):
     print(f"MLflow tracking URI: {get_tracking_uri()}")
     
@@ -31,6 +35,15 @@ def main(
             pipeline_name=PIPELINE_NAME,
             pipeline_step_name=PIPELINE_STEP_NAME,
         )
+
+    elif config == "batch_predict":
+        batch_inference_pipeline(
+            pipeline_name=PIPELINE_NAME,
+            pipeline_step_name=PIPELINE_STEP_NAME,
+            use_service=use_service,
+            chunksize=chunksize,
+            n_jobs=n_jobs,
+        )
     
     elif config == "train":
         # Fallback to just training without deployment if needed, 
@@ -48,7 +61,7 @@ if __name__ == "__main__":
         "--config", 
         type=str, 
         default="deploy", 
-        help="Pipeline configuration: 'deploy', 'predict', or 'train'"
+        help="Pipeline configuration: 'deploy', 'predict', 'batch_predict', or 'train'"
     )
     parser.add_argument(
         "--min-accuracy", 
@@ -56,6 +69,29 @@ if __name__ == "__main__":
         default=0.5, 
         help="Minimum accuracy required to deploy the model"
     )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=50_000,
+        help="Rows per chunk for batch_predict"
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=4,
+        help="Chunks scored concurrently by batch_predict"
+    )
+    parser.add_argument(
+        "--use-service",
+        action="store_true",
+        help="Score batch_predict chunks through the deployed MLflow service instead of model.pkl"
+    )
     args = parser.parse_args()
     
-    main(config=args.config, min_accuracy=args.min_accuracy)
+    main(
+        config=args.config,
+        min_accuracy=args.min_accuracy,
+        chunksize=args.chunksize,
+        n_jobs=args.n_jobs,
+        use_service=args.use_service,
+    )
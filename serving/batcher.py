@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into batched model calls.
+
+    Callers submit small row blocks and block on the result. A dispatcher
+    thread takes the first pending request, keeps collecting until
+    `max_rows` rows are queued or `max_wait_ms` has passed since that request
+    arrived, then scores everything with one `score_fn` call and hands each
+    caller its slice. Up to `max_in_flight` batches are scored concurrently,
+    and requests keep accumulating while a call is in flight, so the added
+    latency is bounded by max_wait_ms plus queueing behind in-flight calls.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[np.ndarray], np.ndarray],
+        max_rows: int = 256,
+        max_wait_ms: float = 5.0,
+        max_in_flight: int = 2,
+    ):
+        """
+        Args:
+            score_fn: Scores a 2-D float array, returning one prediction per row.
+            max_rows: Rows that trigger a batch immediately.
+            max_wait_ms: Longest a request waits for others to join its batch.
+            max_in_flight: Batches scored concurrently.
+        """
+        self.score_fn = score_fn
+        self.max_rows = max(1, int(max_rows))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._slots = threading.Semaphore(max(1, max_in_flight))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="microbatch")
+        self._closed = False
+        self.batches = 0
+        self.rows = 0
+        self._thread = threading.Thread(target=self._run, name="microbatch-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Scores `rows` (1-D for a single row, or 2-D) as part of a batch; blocks until done."""
+        return self.submit_async(rows).result(timeout)
+
+    def submit_async(self, rows: np.ndarray) -> Future:
+        """Queues `rows` and returns a Future for their predictions."""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed.")
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        future: Future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _collect(self, first: Tuple[np.ndarray, Future]) -> List[Tuple[np.ndarray, Future]]:
+        items = [first]
+        n_rows = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while n_rows < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items
+
+    def _score(self, items: List[Tuple[np.ndarray, Future]]):
+        try:
+            blocks = [rows for rows, _ in items]
+            X = blocks[0] if len(blocks) == 1 else np.vstack(blocks)
+            preds = np.asarray(self.score_fn(X), dtype=np.float64).reshape(-1)
+            if len(preds) != len(X):
+                raise ValueError(f"score_fn returned {len(preds)} predictions for {len(X)} rows.")
+            self.batches += 1
+            self.rows += len(X)
+            start = 0
+            for rows, future in items:
+                future.set_result(preds[start:start + len(rows)])
+                start += len(rows)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            items = self._collect(first)
+            self._slots.acquire()
+            self._pool.submit(self._score, items)
+
+    def close(self):
+        """Stops the dispatcher after the queued requests are scored."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            self._pool.shutdown(wait=True)
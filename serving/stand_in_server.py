@@ -0,0 +1,109 @@
+"""
+Local stand-in for the model prediction service.
+
+Serves model.pkl on POST /invocations and accepts npy, Arrow or JSON
+(split orientation, optionally wrapped in "dataframe_split") bodies,
+answering in the request's format. Used to test and benchmark the binary
+transport in serving/transport.py without an MLflow deployment.
+
+Usage:
+    python serving/stand_in_server.py --model model.pkl --predictors predictors.pkl --port 5001
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serving.transport import CONTENT_TYPES, decode_frame, encode_predictions, format_of  # noqa: E402
+from steps.price_optimizer import predict_matrix  # noqa: E402
+
+
+def feature_matrix(X, predictors: Sequence[str]) -> np.ndarray:
+    """
+    The float64 (rows, predictors) matrix of a decoded request body.
+
+    Named columns are matched to the predictors by name and every predictor
+    must be present. Unnamed input (npy, or arrow/json columns named by
+    their position "0", "1", ...) is taken to be in predictor order.
+    """
+    if isinstance(X, pd.DataFrame):
+        names = [str(c) for c in X.columns]
+        if names == [str(i) for i in range(len(names))]:
+            X = X.to_numpy(dtype=np.float64)
+        else:
+            missing = [p for p in predictors if p not in names]
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+            X = X.set_axis(names, axis=1)[list(predictors)].to_numpy(dtype=np.float64)
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    if X.shape[1] != len(predictors):
+        raise ValueError(f"Expected {len(predictors)} features, got {X.shape[1]}.")
+    return X
+
+
+def make_handler(model, predictors: Sequence[str]):
+    predictors = list(predictors)
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep connections open between chunk requests
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path not in ("/invocations", "/predict"):
+                return self._reply(404, b'{"error": "not found"}', CONTENT_TYPES["json"])
+            fmt = format_of(self.headers.get("Content-Type"))
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                X = feature_matrix(decode_frame(body, fmt), predictors)
+                preds = predict_matrix(model, X, predictors)
+            except Exception as e:
+                return self._reply(400, json.dumps({"error": str(e)}).encode(), CONTENT_TYPES["json"])
+            self._reply(200, encode_predictions(preds, fmt), CONTENT_TYPES[fmt])
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(model, predictors: Sequence[str], host: str = "127.0.0.1", port: int = 5001) -> ThreadingHTTPServer:
+    """Creates (but doesn't start) a threaded server for `model`."""
+    server = ThreadingHTTPServer((host, port), make_handler(model, predictors))
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(model, predictors: Sequence[str], host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Starts a server on a background thread; returns it and its /invocations URL (port 0 picks a free port)."""
+    server = serve(model, predictors, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/invocations"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="model.pkl")
+    parser.add_argument("--predictors", default="predictors.pkl")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    args = parser.parse_args()
+    server = serve(joblib.load(args.model), joblib.load(args.predictors), args.host, args.port)
+    print(f"Serving {args.model} on http://{args.host}:{args.port}/invocations")
+    server.serve_forever()
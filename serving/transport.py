@@ -0,0 +1,218 @@
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection
+from typing import List, Optional, Sequence, Union
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+CONTENT_TYPES = {
+    "npy": "application/x-npy",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "json": "application/json",
+}
+FORMATS = {content_type: fmt for fmt, content_type in CONTENT_TYPES.items()}
+DEFAULT_CHUNK_ROWS = 50_000
+
+Frame = Union[pd.DataFrame, np.ndarray]
+
+
+def format_of(content_type: Optional[str]) -> str:
+    """Transport format for a Content-Type header (JSON when missing or unknown)."""
+    return FORMATS.get((content_type or "").split(";")[0].strip(), "json")
+
+
+def encode_frame(X: Frame, fmt: str) -> bytes:
+    """
+    Serializes a feature block for the wire.
+
+    npy sends the raw float64 matrix (column order is the caller's
+    responsibility), arrow sends a record batch stream with column names, and
+    json is MLflow's split orientation. An ndarray sent as arrow or json gets
+    its positions as column names ("0", "1", ...), which servers score by
+    position like npy.
+    """
+    if fmt == "npy":
+        buf = io.BytesIO()
+        np.save(buf, np.ascontiguousarray(np.asarray(X, dtype=np.float64)), allow_pickle=False)
+        return buf.getvalue()
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        df = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if fmt == "json":
+        df = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        return df.to_json(orient="split", index=False).encode()
+    raise ValueError(f"Unknown transport format: {fmt}")
+
+
+def decode_frame(body: bytes, fmt: str) -> Frame:
+    """Inverse of encode_frame; also accepts MLflow's {"dataframe_split": ...} JSON."""
+    if fmt == "npy":
+        return np.load(io.BytesIO(body), allow_pickle=False)
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        return pa.ipc.open_stream(body).read_all().to_pandas()
+    if fmt == "json":
+        payload = json.loads(body)
+        payload = payload.get("dataframe_split", payload)
+        return pd.DataFrame(payload["data"], columns=payload.get("columns"))
+    raise ValueError(f"Unknown transport format: {fmt}")
+
+
+def encode_predictions(preds: np.ndarray, fmt: str) -> bytes:
+    preds = np.asarray(preds, dtype=np.float64).reshape(-1)
+    if fmt == "json":
+        return json.dumps({"predictions": preds.tolist()}).encode()
+    if fmt == "arrow":
+        return encode_frame(pd.DataFrame({"predictions": preds}), "arrow")
+    return encode_frame(preds, fmt)
+
+
+def decode_predictions(body: bytes, fmt: str) -> np.ndarray:
+    if fmt == "json":
+        payload = json.loads(body)
+        preds = payload["predictions"] if isinstance(payload, dict) else payload
+        return np.asarray(preds, dtype=np.float64).reshape(-1)
+    decoded = decode_frame(body, fmt)
+    if isinstance(decoded, pd.DataFrame):
+        decoded = decoded.iloc[:, 0].to_numpy()
+    return np.asarray(decoded, dtype=np.float64).reshape(-1)
+
+
+def split_rows(X: Frame, chunk_rows: int) -> List[Frame]:
+    chunk_rows = max(1, int(chunk_rows))
+    take = X.iloc if isinstance(X, pd.DataFrame) else X
+    return [take[start:start + chunk_rows] for start in range(0, len(X), chunk_rows)] or [X]
+
+
+class PredictionClient:
+    """
+    Scores large inputs against an HTTP prediction endpoint in binary chunks.
+
+    The input is split into `chunk_rows` blocks that are encoded as npy or
+    Arrow (no float-to-text conversion) and posted concurrently over
+    keep-alive connections, one per worker thread. The worker threads live
+    as long as the client, so their connections are reused across predict
+    calls; close() (or a `with` block) shuts them down. Predictions are
+    decoded and reassembled in input order. The server must accept the chosen
+    Content-Type; MLflow's scoring server only takes JSON/CSV, so binary
+    formats target serving/stand_in_server.py or a server that speaks them.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        fmt: str = "npy",
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+        columns: Optional[Sequence[str]] = None,
+    ):
+        """
+        Args:
+            url: Prediction endpoint (path defaults to /invocations).
+            fmt: "npy", "arrow" or "json".
+            chunk_rows: Rows per request.
+            max_concurrency: Requests in flight at once (worker threads).
+            timeout: Socket timeout per request, in seconds.
+            columns: Feature names attached to ndarray inputs sent as arrow
+                or json, so the server can match them by name.
+        """
+        if fmt not in CONTENT_TYPES:
+            raise ValueError(f"Unknown transport format: {fmt}")
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "http"
+        self.netloc = parts.netloc
+        self.path = parts.path or "/invocations"
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.columns = list(columns) if columns is not None else None
+        self._local = threading.local()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _connection(self) -> HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = HTTPSConnection if self.scheme == "https" else HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def _post(self, X: Frame) -> np.ndarray:
+        if self.columns is not None and self.fmt != "npy" and not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X, columns=self.columns)
+        body = encode_frame(X, self.fmt)
+        headers = {"Content-Type": CONTENT_TYPES[self.fmt], "Accept": CONTENT_TYPES[self.fmt]}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, OSError):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Prediction request failed ({response.status}): {data[:200]!r}")
+        preds = decode_predictions(data, format_of(response.getheader("Content-Type")))
+        if len(preds) != len(X):
+            raise RuntimeError(f"Expected {len(X)} predictions, got {len(preds)}.")
+        return preds
+
+    def predict(self, X: Frame) -> np.ndarray:
+        """Scores every row of X; chunks are in flight concurrently and results come back in order."""
+        chunks = split_rows(X, self.chunk_rows)
+        if len(chunks) == 1:
+            return self._post(chunks[0])
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                thread_name_prefix="prediction-client")
+            pool = self._pool
+        return np.concatenate(list(pool.map(self._post, chunks)))
+
+    def close(self):
+        """Stops the worker threads; connections of the calling thread are closed too."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self) -> "PredictionClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def chunked_service_predict(service, X: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                            max_concurrency: int = 4) -> np.ndarray:
+    """JSON scoring through an MLflowDeploymentService, split into concurrent chunk requests."""
+    def call(chunk: pd.DataFrame) -> np.ndarray:
+        return np.asarray(service.predict(chunk.to_json(orient="split")), dtype=np.float64).reshape(-1)
+
+    chunks = split_rows(X, chunk_rows)
+    if len(chunks) == 1:
+        return call(chunks[0])
+    with ThreadPoolExecutor(max_workers=min(max(1, max_concurrency), len(chunks))) as pool:
+        return np.concatenate(list(pool.map(call, chunks)))
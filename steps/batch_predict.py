@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from zenml import step
+from zenml.integrations.mlflow.services import MLFlowDeploymentService
+
+from data.managament.engines import get_engine
+from data.managament.predictions import PredictionWriter
+from serving.transport import DEFAULT_CHUNK_ROWS, PredictionClient
+from steps.feature_transform import FEATURE_TRANSFORM_PATH, FeatureTransform
+from steps.ingest_data import DEFAULT_CHUNKSIZE, iter_table_chunks
+from steps.price_optimizer import predict_matrix
+
+
+class LocalScorer:
+    """
+    Transforms raw rows and scores them with a model loaded in this process.
+
+    The transform's output columns are in transform.predictors order; they
+    are selected by name into the order the model was fitted with
+    (feature_names_in_, else `predictors` from predictors.pkl), so the two
+    orders don't have to agree.
+    """
+
+    def __init__(self, model, transform: FeatureTransform, predictors: Sequence[str]):
+        self.model = model
+        self.transform = transform
+        names = getattr(model, "feature_names_in_", None)
+        self.predictors = [str(c) for c in names] if names is not None else list(predictors)
+        missing = [c for c in self.predictors if c not in transform.predictors]
+        if missing:
+            raise ValueError(f"The feature transform doesn't produce model features: {missing}")
+
+    def __call__(self, chunk: pd.DataFrame) -> np.ndarray:
+        X = self.transform.transform_frame(chunk)[self.predictors].to_numpy(dtype=np.float64)
+        return predict_matrix(self.model, X, self.predictors)
+
+
+class ServiceScorer:
+    """
+    Transforms raw rows locally and scores them through the prediction service.
+
+    JSON goes through MLFlowDeploymentService.predict; "npy" / "arrow" post
+    binary buffers with PredictionClient (see serving/transport.py). npy
+    carries no column names, so every transport sends the columns in the
+    served model's `predictors` order rather than the transform's. close()
+    shuts the client down.
+    """
+
+    def __init__(self, service, transform: FeatureTransform, predictors: Sequence[str],
+                 transport: str = "json", prediction_url: Optional[str] = None):
+        self.service = service
+        self.transform = transform
+        self.predictors = list(predictors)
+        missing = [c for c in self.predictors if c not in transform.predictors]
+        if missing:
+            raise ValueError(f"The feature transform doesn't produce model features: {missing}")
+        self.client = None
+        if transport != "json":
+            self.client = PredictionClient(prediction_url or service.prediction_url, fmt=transport,
+                                           chunk_rows=DEFAULT_CHUNK_ROWS, max_concurrency=1,
+                                           columns=self.predictors)
+
+    def __call__(self, chunk: pd.DataFrame) -> np.ndarray:
+        X = self.transform.transform_frame(chunk)[self.predictors]
+        if self.client is not None:
+            return self.client.predict(X)
+        return np.asarray(self.service.predict(X.to_json(orient="split")), dtype=np.float64).reshape(-1)
+
+    def close(self):
+        """Shuts down the binary transport's client (a no-op for JSON)."""
+        if self.client is not None:
+            self.client.close()
+
+
+_worker_scorer: Optional[Callable[[pd.DataFrame], np.ndarray]] = None
+
+
+def _init_worker(scorer: Callable[[pd.DataFrame], np.ndarray]):
+    """Process pool initializer: ships the scorer (model + transform) to each worker once."""
+    global _worker_scorer
+    _worker_scorer = scorer
+
+
+def _score_in_worker(chunk: pd.DataFrame) -> np.ndarray:
+    return _worker_scorer(chunk)
+
+
+def score_chunks(
+    chunks: Iterable[pd.DataFrame],
+    scorer: Callable[[pd.DataFrame], np.ndarray],
+    n_jobs: int = 4,
+    backend: str = "thread",
+    max_pending: Optional[int] = None,
+) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Scores a stream of chunks concurrently, yielding (chunk, predictions) in input order.
+
+    At most `max_pending` chunks (default 2 * n_jobs) are read ahead of the
+    one being yielded, so memory stays bounded by the chunk size however long
+    the stream is. Threads suit service scoring (I/O bound) and models whose
+    predict releases the GIL; "process" gives local models whole cores, with
+    the scorer pickled to each worker once.
+
+    Args:
+        chunks: Raw row chunks (e.g. from iter_table_chunks).
+        scorer: Function of a chunk returning one prediction per row.
+        n_jobs: Worker threads or processes.
+        backend: "thread" or "process".
+        max_pending: Chunks in flight at once.
+    """
+    n_jobs = max(1, n_jobs)
+    max_pending = max(1, max_pending or 2 * n_jobs)
+    if backend == "thread":
+        pool: Executor = ThreadPoolExecutor(max_workers=n_jobs, thread_name_prefix="batch-predict")
+        call = scorer
+    elif backend == "process":
+        pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(scorer,))
+        call = _score_in_worker
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(call, chunk)))
+            if len(pending) >= max_pending:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def model_version_of(model_path: str, service=None) -> str:
+    """The service's model URI, or a content hash of the local model file."""
+    model_uri = getattr(getattr(service, "config", None), "model_uri", None)
+    if model_uri:
+        return str(model_uri)
+    with open(model_path, "rb") as f:
+        return f"local:{hashlib.sha256(f.read()).hexdigest()[:12]}"
+
+
+@step(enable_cache=False)
+def batch_predict(
+    service: Optional[MLFlowDeploymentService] = None,
+    table_name: str = "retail_prices",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    n_jobs: int = 4,
+    backend: str = "thread",
+    transport: str = "json",
+    prediction_url: Optional[str] = None,
+    model_path: str = "model.pkl",
+    predictors_path: str = "predictors.pkl",
+    transform_path: str = FEATURE_TRANSFORM_PATH,
+    model_version: Optional[str] = None,
+) -> int:
+    """
+    Scores a table chunk by chunk and writes the predictions back to the database.
+
+    The table is streamed with a server-side cursor, chunks are scored
+    concurrently (see score_chunks) and every scored chunk is bulk-written to
+    retail_price_predictions as (id, predicted_qty, model_version, scored_at),
+    so memory use doesn't depend on the table size. All rows of a run share
+    one scored_at and are committed together.
+
+    Args:
+        service: Deployed MLflow prediction service; None scores with the
+            local model at `model_path`.
+        table_name: Table to score.
+        chunksize: Rows per streamed chunk.
+        n_jobs: Chunks scored at once.
+        backend: "thread" or "process" (local model only).
+        transport: "json", "npy" or "arrow" for service scoring (see predictor).
+        prediction_url: Endpoint for the binary transports.
+        model_path: Local model (scored locally, and hashed for the default model_version).
+        predictors_path: Predictor order of the model (local or served).
+        transform_path: Fitted FeatureTransform (from process_data).
+        model_version: Label stored with every prediction (defaults to the
+            service's model URI or a hash of model.pkl).
+
+    Returns:
+        int: Number of predictions written.
+    """
+    scorer = None
+    try:
+        if not os.path.exists(transform_path):
+            raise FileNotFoundError(f"{transform_path} not found; fit it with process_data first.")
+        transform = FeatureTransform.load(transform_path)
+        predictors = joblib.load(predictors_path) if os.path.exists(predictors_path) else transform.predictors
+
+        if service is not None:
+            service.start(timeout=10)  # should be a NOP if already started
+            if backend != "thread":
+                logging.warning("Service scoring is I/O bound; using the thread backend.")
+                backend = "thread"
+            scorer = ServiceScorer(service, transform, predictors, transport, prediction_url)
+        else:
+            scorer = LocalScorer(joblib.load(model_path), transform, predictors)
+        model_version = model_version or model_version_of(model_path, service)
+        scored_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        engine = get_engine(os.getenv("DB_URL"))
+        chunks = iter_table_chunks(engine, table_name, chunksize=chunksize)
+        start = time.perf_counter()
+        with PredictionWriter(engine) as writer:
+            for chunk, preds in score_chunks(chunks, scorer, n_jobs=n_jobs, backend=backend):
+                writer.write(pd.DataFrame({
+                    "id": chunk["id"].to_numpy(dtype=np.int64),
+                    "predicted_qty": preds,
+                    "model_version": model_version,
+                    "scored_at": scored_at,
+                }))
+        elapsed = time.perf_counter() - start
+        logging.info(f"Wrote {writer.rows} predictions ({model_version}) in {elapsed:.2f}s "
+                     f"({writer.rows / max(elapsed, 1e-9):,.0f} rows/s).")
+        return writer.rows
+
+    except Exception as e:
+        logging.error(f"Error while batch scoring {table_name}: {e}")
+        raise e
+    finally:
+        if isinstance(scorer, ServiceScorer):
+            scorer.close()
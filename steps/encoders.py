@@ -0,0 +1,103 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ENCODED_COLUMNS = ["product_id", "product_category_name", "product_score"]
+ENCODERS_PATH = "encoders.pkl"
+UNKNOWN_CODE = -1
+
+
+class CategoryEncoder:
+    """Label encoder with a frozen vocabulary and an explicit unknown bucket.
+
+    Codes match sklearn's LabelEncoder (index into the sorted classes), but
+    transform is a vectorized hash lookup and values not seen during fit map
+    to `unknown_value` instead of raising.
+    """
+
+    def __init__(self, unknown_value: int = UNKNOWN_CODE):
+        self.unknown_value = unknown_value
+        self.classes_ = None
+        self.mapping_ = {}
+
+    def fit(self, values) -> "CategoryEncoder":
+        """Learns the sorted vocabulary of `values` (nulls are ignored)."""
+        self.classes_ = np.sort(np.asarray(pd.Series(values).dropna().unique()))
+        self.mapping_ = {value: code for code, value in enumerate(self.classes_.tolist())}
+        return self
+
+    def _coerce(self, values) -> Tuple[np.ndarray, np.ndarray]:
+        """`values` and the classes in a common dtype for lookup."""
+        values = np.asarray(values)
+        classes = self.classes_
+        # Compare floats at the narrower precision, so float32 product_score
+        # matches classes fitted on float64 and vice versa
+        if classes.dtype.kind in "iuf" and values.dtype.kind in "iufO":
+            dtype = classes.dtype if classes.dtype.kind == "f" else np.dtype(np.float64)
+            if values.dtype.kind == "f" and values.dtype.itemsize < dtype.itemsize:
+                dtype = values.dtype
+                classes = classes.astype(dtype)
+            values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=dtype)
+        return values, classes
+
+    def _lookup(self, values) -> np.ndarray:
+        values, classes = self._coerce(values)
+        codes = pd.Index(classes).get_indexer(values).astype(np.int32)
+        if self.unknown_value != -1:
+            codes[codes == -1] = self.unknown_value
+        return codes
+
+    def transform(self, values) -> np.ndarray:
+        """Codes for `values`; unseen values and nulls get `unknown_value`."""
+        if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+            # Encode the (few) categories once and gather through the existing codes
+            cat = pd.Categorical(values)
+            lookup = np.append(self._lookup(np.asarray(cat.categories)), np.int32(self.unknown_value))
+            return lookup[cat.codes]
+        return self._lookup(values)
+
+    def transform_one(self, value) -> int:
+        """Code for a single value (e.g. a form field)."""
+        if self.classes_.dtype.kind in "iuf":
+            try:
+                value = self.classes_.dtype.type(value)
+            except (TypeError, ValueError):
+                return self.unknown_value
+        return self.mapping_.get(value.item() if hasattr(value, "item") else value, self.unknown_value)
+
+    def fit_transform(self, values) -> np.ndarray:
+        return self.fit(values).transform(values)
+
+
+class EncoderSet:
+    """Fitted CategoryEncoders for several columns, persisted next to model.pkl."""
+
+    def __init__(self, encoders: Optional[Dict[str, CategoryEncoder]] = None):
+        self.encoders = encoders or {}
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.encoders)
+
+    def fit(self, df: pd.DataFrame, columns: Iterable[str] = ENCODED_COLUMNS) -> "EncoderSet":
+        self.encoders = {col: CategoryEncoder().fit(df[col]) for col in columns if col in df.columns}
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Replaces the encoded columns of `df` with their codes, in place."""
+        for col, encoder in self.encoders.items():
+            if col in df.columns:
+                df[col] = encoder.transform(df[col])
+        return df
+
+    def fit_transform(self, df: pd.DataFrame, columns: Iterable[str] = ENCODED_COLUMNS) -> pd.DataFrame:
+        return self.fit(df, columns).transform(df)
+
+    def save(self, path: str = ENCODERS_PATH):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str = ENCODERS_PATH) -> "EncoderSet":
+        return joblib.load(path)
@@ -9,13 +9,24 @@ import mlflow
 from zenml.client import Client
 from zenml.integrations.mlflow.experiment_trackers import MLFlowExperimentTracker
 
+from steps.step_cache import cached_step
+
 logger = get_logger(__name__)
 
 # Verify experiment tracker
 experiment_tracker = Client().active_stack.experiment_tracker
 tracker_name = experiment_tracker.name if experiment_tracker and isinstance(experiment_tracker, MLFlowExperimentTracker) else None
 
+
+def log_evaluation(result: Tuple[float, float], arguments: dict = None):
+    """Logs evaluation's (mse, rmse) to the active MLflow run; also replays them on a step cache hit."""
+    mse, rmse = result
+    mlflow.log_metric("mse", mse)
+    mlflow.log_metric("rmse", rmse)
+
+
 @step(experiment_tracker=tracker_name)
+@cached_step(on_hit=log_evaluation)
 def evaluation(
     model: LinearRegression,
     X_test: pd.DataFrame,
@@ -33,9 +44,8 @@ def evaluation(
         logger.info(f"MSE: {mse}")
         logger.info(f"RMSE: {rmse}")
         
-        mlflow.log_metric("mse", mse)
-        mlflow.log_metric("rmse", rmse)
-        
+        log_evaluation((mse, rmse))
+
         return mse, rmse
     except Exception as e:
         logger.error(e)
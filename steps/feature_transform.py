@@ -0,0 +1,128 @@
+from typing import List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data.managament.schema import CSV_DATE_FORMAT
+from steps.encoders import ENCODED_COLUMNS, EncoderSet
+
+FEATURE_TRANSFORM_PATH = "feature_transform.pkl"
+TARGET = "qty"
+DATE_COLUMN = "month_year"
+DATE_FEATURES = ["month", "year", "is_weekend"]
+
+
+def _parse_dates(values, date_format: str) -> pd.DatetimeIndex:
+    """Parses distinct date values with `date_format`, inferring only for the ones that don't match."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.DatetimeIndex(values)
+    values = pd.Index(values)
+    dates = pd.to_datetime(values, format=date_format, errors="coerce")
+    failed = dates.isna() & values.notna()
+    if failed.any():
+        # e.g. ISO strings coming back from the database instead of the CSV format
+        dates = dates.where(~failed, pd.to_datetime(values.where(failed), errors="coerce"))
+    return pd.DatetimeIndex(dates)
+
+
+def date_features(values, date_format: str = CSV_DATE_FORMAT) -> dict:
+    """
+    month / year / is_weekend arrays for a column of dates.
+
+    month_year only has a few dozen distinct values, so dates are parsed and
+    the features computed once per distinct value, then broadcast back to the
+    rows through the categorical (or factorized) codes. Nulls and unparseable
+    values get 0 / False, as fillna(0) did.
+
+    Args:
+        values: Series of strings, categories or datetimes.
+        date_format: Explicit strptime format tried before inference.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    dates = _parse_dates(uniques, date_format)
+    valid = ~dates.isna()
+    # The extra trailing slot is what code -1 (null) gathers
+    month = np.append(np.where(valid, dates.month.fillna(0), 0).astype(np.int32), np.int32(0))
+    year = np.append(np.where(valid, dates.year.fillna(0), 0).astype(np.int32), np.int32(0))
+    is_weekend = np.append(np.where(valid, dates.dayofweek.fillna(0) > 4, False), False)
+    return {"month": month[codes], "year": year[codes], "is_weekend": is_weekend[codes]}
+
+
+class FeatureTransform:
+    """Fitted preprocessing shared by training, inference and the app.
+
+    Does what categorical_encode + feature_engineer + dropping the target did,
+    in one pass and without intermediate frames: every output column is
+    written straight into a preallocated float64 matrix in `predictors` order
+    (encoded categories, month/year/is_weekend from month_year, numeric
+    nulls -> 0).
+    """
+
+    def __init__(
+        self,
+        target: str = TARGET,
+        date_column: str = DATE_COLUMN,
+        encoded_columns: List[str] = ENCODED_COLUMNS,
+    ):
+        self.target = target
+        self.date_column = date_column
+        self.encoded_columns = list(encoded_columns)
+        self.encoders = EncoderSet()
+        self.predictors: List[str] = []
+
+    def fit(self, df: pd.DataFrame) -> "FeatureTransform":
+        """Fits the encoders and fixes the output column order.
+
+        The order matches the old pipeline: input columns minus the target and
+        the date, with month/year replaced in place and is_weekend appended.
+        """
+        self.encoders = EncoderSet().fit(df, self.encoded_columns)
+        columns = [c for c in df.columns if c not in (self.target, self.date_column)]
+        if self.date_column in df.columns:
+            columns += [c for c in DATE_FEATURES if c not in columns]
+        self.predictors = columns
+        return self
+
+    def _date_features(self, df: pd.DataFrame) -> dict:
+        if self.date_column not in df.columns:
+            return {}
+        return date_features(df[self.date_column])
+
+    def transform(self, df: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Writes the features of `df` into a (len(df), len(predictors)) float64 matrix.
+
+        Args:
+            df: Raw rows (as ingested). Missing predictors are filled with 0.
+            out: Optional preallocated matrix to write into.
+        """
+        if out is None:
+            # Column-major, so each feature is one contiguous write
+            out = np.empty((len(df), len(self.predictors)), dtype=np.float64, order="F")
+        dates = self._date_features(df)
+        encoders = self.encoders.encoders
+        for j, col in enumerate(self.predictors):
+            if col in dates:
+                out[:, j] = dates[col]
+            elif col not in df.columns:
+                out[:, j] = 0.0
+            elif col in encoders:
+                # Unseen values and nulls land in the encoder's unknown bucket
+                out[:, j] = encoders[col].transform(df[col])
+            else:
+                out[:, j] = df[col].to_numpy(dtype=np.float64, na_value=0.0)
+        return out
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """transform() wrapped in a DataFrame (no copy) with `predictors` as columns."""
+        return pd.DataFrame(self.transform(df), columns=self.predictors, index=df.index, copy=False)
+
+    def save(self, path: str = FEATURE_TRANSFORM_PATH):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str = FEATURE_TRANSFORM_PATH) -> "FeatureTransform":
+        return joblib.load(path)
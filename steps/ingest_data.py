@@ -1,47 +1,389 @@
 import pandas as pd
+import numpy as np
 from zenml import step
 import logging
 import os
+import json
+from decimal import Decimal
+from typing import Any, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from data.managament.dataset_cache import DatasetCache
+from data.managament.engines import get_engine
+from data.managament.schema import apply_dtypes, reflect_dtypes, stream_dtypes, table_dtypes
+from steps.encoders import ENCODERS_PATH, EncoderSet
+from steps.feature_transform import FEATURE_TRANSFORM_PATH, FeatureTransform
+from steps.step_cache import cached_step
 
 # Load env variables from CWD (Project Root)
 load_dotenv(os.path.join(os.getcwd(), ".env"))
 
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), ".cache", "ingest")
+
+
+def build_select(engine: Engine, table_name: str, columns: Optional[List[str]] = None) -> str:
+    """Builds a SELECT with quoted identifiers, projecting only `columns` when given."""
+    quote = engine.dialect.identifier_preparer.quote
+    cols = ", ".join(quote(c) for c in columns) if columns else "*"
+    return f"SELECT {cols} FROM {quote(table_name)}"
+
+
+def iter_table_chunks(
+    engine: Engine,
+    table_name: str,
+    columns: Optional[List[str]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    downcast: bool = True,
+    dtypes: Optional[dict] = None,
+    after: Optional[Tuple[str, Any]] = None,
+    precision: str = "compact",
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams a table in chunks using a server-side cursor.
+
+    Only `chunksize` rows are held by the driver and pandas at a time, so
+    peak memory is bounded by the chunk size rather than the table size.
+    Every chunk is cast to the same dtypes, taken from the table's schema
+    rather than from the values of the chunk (see schema.stream_dtypes), so
+    chunks can be written to one Parquet file or concatenated safely.
+
+    Args:
+        engine: SQLAlchemy engine.
+        table_name: Table to read.
+        columns: Columns to project (all when None).
+        chunksize: Rows per chunk.
+        downcast: Cast chunks to the compact dtypes of the table as reflected
+            from the database; False yields the driver's dtypes unchanged.
+        dtypes: Dtype map to use instead of the reflected one (see schema.dtype_map).
+        after: Optional (column, value); only rows with column > value are read.
+        precision: "compact" or "full" for the reflected dtypes.
+    """
+    if dtypes is None and downcast:
+        dtypes = reflect_dtypes(engine, table_name, precision)
+    if dtypes:
+        dtypes = stream_dtypes(dtypes)
+    query = build_select(engine, table_name, columns)
+    params = {}
+    if after is not None:
+        query += f" WHERE {engine.dialect.identifier_preparer.quote(after[0])} > :after"
+        params["after"] = after[1]
+    with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+        for chunk in pd.read_sql(text(query), conn, params=params, chunksize=chunksize):
+            yield apply_dtypes(chunk, dtypes) if dtypes else chunk
+
+
+def spill_to_parquet(chunks: Iterator[pd.DataFrame], path: str) -> int:
+    """
+    Writes a stream of chunks to one Parquet file, one row group per chunk.
+
+    The chunks must share dtypes (as iter_table_chunks yields them). Category
+    columns are stored with 32-bit dictionary indices so chunks with more or
+    fewer distinct values still match the file's schema.
+
+    Returns:
+        int: Number of rows written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is required to spill ingested data to Parquet.") from e
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = pa.schema([
+                    field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                    if pa.types.is_dictionary(field.type) else field
+                    for field in table.schema
+                ], metadata=table.schema.metadata)
+                writer = pq.ParquetWriter(path, schema)
+            if table.schema != writer.schema:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _cache_paths(cache_dir: str, table_name: str) -> Tuple[str, str]:
+    """Returns (data_path, state_path) of the incremental cache for a table."""
+    return (
+        os.path.join(cache_dir, f"{table_name}.parquet"),
+        os.path.join(cache_dir, f"{table_name}.watermark.json"),
+    )
+
+
+def _encode_watermark(value: Any) -> dict:
+    if isinstance(value, (pd.Timestamp, np.datetime64)) or hasattr(value, "isoformat"):
+        return {"type": "datetime", "value": pd.Timestamp(value).isoformat()}
+    if isinstance(value, (int, np.integer)):
+        return {"type": "int", "value": int(value)}
+    if isinstance(value, (float, np.floating, Decimal)):
+        return {"type": "float", "value": float(value)}
+    return {"type": "str", "value": str(value)}
+
+
+def _decode_watermark(state: dict) -> Any:
+    if state["type"] == "datetime":
+        return pd.Timestamp(state["value"]).to_pydatetime()
+    return state["value"]
+
+
+def load_watermark(table_name: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Optional[dict]:
+    """Returns the persisted incremental state for a table, or None before the first run."""
+    _, state_path = _cache_paths(cache_dir, table_name)
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def ingest_incremental(
+    engine: Engine,
+    table_name: str,
+    watermark_column: str = "id",
+    key_column: str = "id",
+    columns: Optional[List[str]] = None,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    chunksize: Optional[int] = None,
+    dtypes: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+    Fetches only rows past the persisted high-water mark and merges them into a local cache.
+
+    A watermark on a non-unique column (e.g. month_year) is compared with >= so
+    the latest period is re-read and late or changed rows replace their cached
+    version (deduplicated on `key_column`). A watermark on the key itself uses >.
+
+    Args:
+        engine: SQLAlchemy engine.
+        table_name: Table to read.
+        watermark_column: Monotonic column new rows are detected by (id or month_year).
+        key_column: Unique row key used to merge the delta into the cache.
+        columns: Columns to project (all when None). The key and watermark are always read.
+        cache_dir: Directory holding the cached rows and watermark state.
+        chunksize: Read the delta in chunks of this many rows.
+        dtypes: Schema dtype map applied to the delta and the merged result
+            (reflected from the table when None).
+    """
+    if columns:
+        columns = list(dict.fromkeys(list(columns) + [key_column, watermark_column]))
+    data_path, state_path = _cache_paths(cache_dir, table_name)
+    state = load_watermark(table_name, cache_dir)
+    # A cache built for another watermark or projection can't be extended
+    if state and (state.get("watermark_column") != watermark_column or state.get("columns") != columns
+                  or not os.path.exists(data_path)):
+        state = None
+
+    query = build_select(engine, table_name, columns)
+    params = {}
+    if state:
+        op = ">" if watermark_column == key_column else ">="
+        query += f" WHERE {engine.dialect.identifier_preparer.quote(watermark_column)} {op} :watermark"
+        params["watermark"] = _decode_watermark(state["watermark"])
+
+    dtypes = dtypes or reflect_dtypes(engine, table_name)
+    if chunksize:
+        with engine.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as conn:
+            frames = [apply_dtypes(c, dtypes) for c in pd.read_sql(text(query), conn, params=params, chunksize=chunksize)]
+        delta = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+    else:
+        delta = apply_dtypes(pd.read_sql(text(query), engine, params=params), dtypes)
+    logging.info(f"Fetched {len(delta)} new/changed rows from {table_name} (watermark={params.get('watermark')}).")
+
+    if not state:
+        df = delta
+    elif delta.empty:
+        return pd.read_parquet(data_path)
+    else:
+        df = pd.concat([pd.read_parquet(data_path), delta], ignore_index=True)
+        df = df.drop_duplicates(subset=[key_column], keep="last").reset_index(drop=True)
+        # Concatenating categoricals with different categories falls back to object
+        df = apply_dtypes(df, dtypes)
+
+    if df.empty:
+        return df
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_parquet(data_path + ".tmp", index=False)
+    os.replace(data_path + ".tmp", data_path)
+    new_state = {
+        "table": table_name,
+        "watermark_column": watermark_column,
+        "columns": columns,
+        "watermark": _encode_watermark(df[watermark_column].max()),
+        "rows": len(df),
+    }
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(new_state, f)
+    os.replace(state_path + ".tmp", state_path)
+    return df
+
+
+def _table_state(arguments: dict) -> Optional[list]:
+    """
+    What the database contributes to ingest_data's cache key: the URL and the
+    table's fingerprint (row count, max id, change signal; see DatasetCache).
+    """
+    db_url = os.getenv("DB_URL")
+    if not db_url:
+        return None
+    return [db_url, DatasetCache.fingerprint(get_engine(db_url), arguments["table_name"],
+                                             checksum=arguments["checksum"])]
+
+
 @step
+@cached_step(depends_on=["data.managament.schema"], key_fn=_table_state,
+             bypass=lambda arguments: arguments["incremental"])
 def ingest_data(
     table_name: str = "retail_prices",
     for_predict: bool = False,
+    chunksize: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    incremental: bool = False,
+    watermark_column: str = "id",
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    use_cache: bool = False,
+    precision: str = "compact",
+    checksum: bool = False,
 ) -> pd.DataFrame:
     """
     Ingests data directly from DB to avoid module path issues.
+
+    The step cache is keyed on the table's fingerprint (see
+    DatasetCache.fingerprint). Incremental runs aren't step-cached: they keep
+    their own watermark and fetch only the delta.
+
+    Args:
+        table_name: Table to read.
+        for_predict: Drop the 'qty' target column.
+        chunksize: Stream the table in chunks of this many rows (downcasting
+            dtypes on the fly) instead of one read.
+        columns: Only read these columns.
+        incremental: Only fetch rows past the persisted watermark and merge
+            them into the local cache (see ingest_incremental).
+        watermark_column: Column the watermark is kept on ("id" or "month_year").
+        cache_dir: Where the incremental cache and watermark are stored.
+        use_cache: Serve the query from the local Arrow dataset cache, refreshed
+            when the table's fingerprint changes.
+        precision: Dtypes for tables defined in index.py: "compact" casts to
+            float32/int16/category on read, "full" keeps NUMERIC as float64.
+        checksum: Also key the step cache and use_cache on a checksum of the
+            table's rows, for engines whose change signal can't see in-place
+            updates. Scans the whole table on every call.
     """
     try:
         db_url = os.getenv("DB_URL")
         if not db_url:
             raise ValueError("DB_URL environment variable is not set. Please set it in .env file.")
 
-        engine = create_engine(db_url)
-        
-        query = f"SELECT * FROM {table_name}"
-        df = pd.read_sql(query, engine)
-        
+        engine = get_engine(db_url)
+
+        if for_predict and columns:
+            columns = [c for c in columns if c != "qty"]
+        dtypes = table_dtypes(table_name, precision)
+
+        if incremental:
+            df = ingest_incremental(
+                engine,
+                table_name,
+                watermark_column=watermark_column,
+                columns=columns,
+                cache_dir=cache_dir,
+                chunksize=chunksize,
+                dtypes=dtypes,
+            )
+        elif use_cache:
+            df = DatasetCache(checksum=checksum).get(engine, table_name, build_select(engine, table_name, columns), dtypes=dtypes)
+        elif chunksize:
+            frames = list(iter_table_chunks(engine, table_name, columns=columns, chunksize=chunksize,
+                                            precision=precision))
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+            if dtypes:
+                # Concatenating categoricals with different categories falls back to object
+                df = apply_dtypes(df, dtypes)
+        else:
+            query = build_select(engine, table_name, columns)
+            df = pd.read_sql(text(query), engine)
+            if dtypes:
+                df = apply_dtypes(df, dtypes)
+
         logging.info(f"Ingested {len(df)} rows from database.")
 
         if for_predict:
             if "qty" in df.columns:
                 df.drop(columns=["qty"], inplace=True)
             logging.info("Dropped 'qty' column for prediction.")
-                
+
         return df
-        
+
     except Exception as e:
         logging.error(f"Error while ingesting data: {e}")
         raise e
 
+
+@step(enable_cache=False)
+def spill_table(
+    path: str,
+    table_name: str = "retail_prices",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[List[str]] = None,
+    precision: str = "compact",
+) -> str:
+    """
+    Streams a table into a Parquet file without materializing it.
+
+    Only one chunk is in memory at a time. The step returns the file's path
+    rather than a DataFrame, so downstream steps read just the columns or
+    row groups they need (pd.read_parquet(path, columns=...),
+    pyarrow.parquet.ParquetFile(path).iter_batches()).
+
+    Args:
+        path: Parquet file to write (replaced if it exists).
+        table_name: Table to read.
+        chunksize: Rows per chunk / row group.
+        columns: Only read these columns.
+        precision: "compact" or "full" dtypes (see iter_table_chunks).
+
+    Returns:
+        str: `path`.
+    """
+    db_url = os.getenv("DB_URL")
+    if not db_url:
+        raise ValueError("DB_URL environment variable is not set. Please set it in .env file.")
+    chunks = iter_table_chunks(get_engine(db_url), table_name, columns=columns, chunksize=chunksize,
+                               precision=precision)
+    rows = spill_to_parquet(chunks, path)
+    logging.info(f"Spilled {rows} rows of {table_name} to {path}.")
+    return path
+
+
 @step
-def ingest_data_for_inference(table_name: str = "retail_prices") -> pd.DataFrame:
+def ingest_data_for_inference(
+    table_name: str = "retail_prices",
+    transform_path: str = FEATURE_TRANSFORM_PATH,
+    encoders_path: str = ENCODERS_PATH,
+) -> pd.DataFrame:
     """
     Ingests data specifically for inference.
+
+    Rows go through the FeatureTransform fitted at training time, so the
+    output has exactly the model's predictors in training order. Artifacts
+    from before the transform existed fall back to the persisted encoders.
     """
-    return ingest_data.entrypoint(table_name=table_name, for_predict=True)
+    df = ingest_data.entrypoint(table_name=table_name, for_predict=True)
+    if os.path.exists(transform_path):
+        return FeatureTransform.load(transform_path).transform_frame(df)
+    if os.path.exists(encoders_path):
+        return EncoderSet.load(encoders_path).transform(df)
+    logging.warning(f"No fitted transform at {transform_path}; categorical columns are left unencoded.")
+    return df
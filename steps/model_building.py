@@ -1,5 +1,7 @@
+import os
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 
 import lxml
 import matplotlib.pyplot as plt
@@ -7,13 +9,14 @@ import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 from numpy import sqrt
-from scipy.stats import shapiro
+from scipy.stats import shapiro, t as student_t
+from sklearn.base import BaseEstimator, RegressorMixin
 from sklearn.dummy import DummyRegressor
+from sklearn.linear_model import LinearRegression
 from sklearn.metrics import make_scorer, mean_squared_error
-from sklearn.model_selection import KFold, cross_val_score, train_test_split
+from sklearn.model_selection import KFold, RepeatedKFold, cross_val_score, train_test_split
 from statsmodels.formula.api import ols
 from statsmodels.graphics.gofplots import qqplot
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 
 
 class DataSplitter:
@@ -252,6 +255,289 @@ class BaselineModel(Model):
         print(f"Baseline MSE: {mse_scores.mean()}")
         print(f"Baseline RMSE: {rmse_scores.mean()}")
 
+class IncrementalOLS(BaseEstimator, RegressorMixin):
+    """OLS with an intercept, fitted from chunks via accumulated normal equations.
+
+    partial_fit only adds the chunk's X'X, X'y and y'y to running totals, so
+    the full training table never has to be in memory and a new month of data
+    can be added later without revisiting history. Sums are taken around the
+    first chunk's means to avoid cancellation from large offsets (e.g. year),
+    and the solve is scaled by the diagonal. Exposes sklearn's coef_ /
+    intercept_ / predict plus statsmodels-style params_, bse_, tvalues_ and
+    pvalues_ (indexed by "const" and the feature names).
+    """
+
+    def _reset(self):
+        for attr in ("n_samples_seen_", "x_shift_", "y_shift_", "xtx_", "xty_", "yty_"):
+            self.__dict__.pop(attr, None)
+
+    def fit(self, X, y):
+        """Fits from scratch on one in-memory chunk."""
+        self._reset()
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y):
+        """Adds a chunk of rows and re-solves."""
+        if hasattr(X, "columns"):
+            names = np.asarray(X.columns, dtype=object)
+            if hasattr(self, "feature_names_in_") and list(names) != list(self.feature_names_in_):
+                raise ValueError("partial_fit chunks must have the same columns as the first chunk.")
+            self.feature_names_in_ = names
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if not hasattr(self, "n_samples_seen_"):
+            p = X.shape[1]
+            self.n_features_in_ = p
+            self.x_shift_ = X.mean(axis=0)
+            self.y_shift_ = float(y.mean())
+            self.xtx_ = np.zeros((p + 1, p + 1))
+            self.xty_ = np.zeros(p + 1)
+            self.yty_ = 0.0
+            self.n_samples_seen_ = 0
+        elif X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}.")
+
+        Z = np.empty((len(X), X.shape[1] + 1))
+        Z[:, 0] = 1.0
+        np.subtract(X, self.x_shift_, out=Z[:, 1:])
+        yc = y - self.y_shift_
+        self.xtx_ += Z.T @ Z
+        self.xty_ += Z.T @ yc
+        self.yty_ += float(yc @ yc)
+        self.n_samples_seen_ += len(X)
+        self._solve()
+        return self
+
+    def _solve(self):
+        d = np.sqrt(np.diag(self.xtx_))
+        d[d == 0] = 1.0
+        scaled_inv = np.linalg.pinv(self.xtx_ / np.outer(d, d), hermitian=True)
+        xtx_inv = scaled_inv / np.outer(d, d)
+        beta = xtx_inv @ self.xty_
+
+        # Undo the shifts: intercept = y_shift + b0 - x_shift . b
+        T = np.eye(len(beta))
+        T[0, 1:] = -self.x_shift_
+        params = T @ beta
+        params[0] += self.y_shift_
+        self.intercept_ = float(params[0])
+        self.coef_ = params[1:]
+
+        rank = np.linalg.matrix_rank(self.xtx_ / np.outer(d, d), hermitian=True)
+        self.df_resid_ = self.n_samples_seen_ - rank
+        sse = max(self.yty_ - beta @ self.xty_, 0.0)
+        self.sigma2_ = sse / self.df_resid_ if self.df_resid_ > 0 else np.nan
+        cov = self.sigma2_ * (T @ xtx_inv @ T.T)
+        names = ["const"] + [str(c) for c in getattr(self, "feature_names_in_", range(len(self.coef_)))]
+        self.params_ = pd.Series(params, index=names)
+        self.bse_ = pd.Series(np.sqrt(np.maximum(np.diag(cov), 0.0)), index=names)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.tvalues_ = self.params_ / self.bse_
+        self.pvalues_ = pd.Series(2 * student_t.sf(np.abs(self.tvalues_), self.df_resid_), index=names)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def summary_frame(self) -> pd.DataFrame:
+        """Coefficient table in the layout of statsmodels' summary (coef, std err, t, P>|t|)."""
+        return pd.DataFrame({"coef": self.params_, "std err": self.bse_, "t": self.tvalues_, "P>|t|": self.pvalues_})
+
+
+class IncrementalLinearRegressionModel(Model):
+    """Linear regression trained out of core with IncrementalOLS."""
+
+    def __init__(self, X_train: pd.DataFrame = None, y_train: pd.Series = None,
+                 chunks: Optional[Iterable[Tuple[pd.DataFrame, pd.Series]]] = None,
+                 model: Optional[IncrementalOLS] = None):
+        """
+        Args:
+        X_train: pandas DataFrame, the training features (when they fit in memory).
+        y_train: pandas Series, the training target.
+        chunks: iterable of (X, y) chunks, e.g. transformed table chunks.
+        model: a fitted IncrementalOLS to keep updating (warm start).
+        """
+        self.X_train = X_train
+        self.y_train = y_train
+        self.chunks = chunks
+        self.model = model
+
+    def train(self):
+        """Feeds every chunk to partial_fit."""
+        if self.model is None:
+            self.model = IncrementalOLS()
+        chunks = self.chunks if self.chunks is not None else [(self.X_train, self.y_train)]
+        for X, y in chunks:
+            self.model.partial_fit(X, y)
+        return self.model
+
+    def validate(self, k=10, chunks: Optional[Iterable[Tuple[pd.DataFrame, pd.Series]]] = None):
+        """K-fold cross-validation in one pass over the chunks.
+
+        Rows are assigned to folds by their position in the stream (row i goes
+        to fold i mod k), since the number of rows isn't known up front. Only
+        each fold's X'X, X'y and y'y are accumulated; a fold's training
+        solution is the total minus that fold, as in ModelRefinement.validate,
+        so memory doesn't depend on the number of rows.
+
+        Args:
+            k: Number of folds.
+            chunks: (X, y) chunks to validate on; defaults to the training
+                data (a one-shot generator consumed by train can't be reused).
+
+        Returns:
+            float: RMSE over all folds.
+        """
+        if chunks is None:
+            chunks = self.chunks if self.chunks is not None else [(self.X_train, self.y_train)]
+        grams, seen, x_shift, y_shift = None, 0, None, 0.0
+        for X, y in chunks:
+            X = np.asarray(X, dtype=np.float64)
+            y = np.asarray(y, dtype=np.float64).ravel()
+            if grams is None:
+                # Centre on the first chunk's means, like IncrementalOLS, to keep X'X well conditioned
+                x_shift, y_shift = X.mean(axis=0), float(y.mean())
+                p = X.shape[1] + 1
+                grams = [[np.zeros((p, p)), np.zeros(p), 0.0, 0] for _ in range(k)]
+            Z = np.empty((len(X), X.shape[1] + 1))
+            Z[:, 0] = 1.0
+            np.subtract(X, x_shift, out=Z[:, 1:])
+            yc = y - y_shift
+            folds = (seen + np.arange(len(X))) % k
+            for fold, gram in enumerate(grams):
+                rows = folds == fold
+                fold_xtx, fold_xty, fold_yty = _fold_gram(Z[rows], yc[rows])
+                gram[0] += fold_xtx
+                gram[1] += fold_xty
+                gram[2] += fold_yty
+                gram[3] += int(rows.sum())
+            seen += len(X)
+        if grams is None or seen < k:
+            raise ValueError(f"Need at least {k} rows to validate; pass the chunks again if train consumed them.")
+
+        xtx = sum(g[0] for g in grams)
+        xty = sum(g[1] for g in grams)
+        errors = []
+        for fold_xtx, fold_xty, fold_yty, n in grams:
+            A, b = xtx - fold_xtx, xty - fold_xty
+            d = np.sqrt(np.diag(A))
+            d[d == 0] = 1.0
+            beta = np.linalg.lstsq(A / np.outer(d, d), b / d, rcond=None)[0] / d
+            sse = fold_yty - 2 * beta @ fold_xty + beta @ fold_xtx @ beta
+            errors.append(max(sse, 0.0) / n)
+            print(f"MSE: {errors[-1]}")
+        self.cv_errors = errors
+        self.rmse = float(np.sqrt(np.mean(errors)))
+        return self.rmse
+
+
+def _fit_linear(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Fits one shard; module level so process pools can pickle it."""
+    model = LinearRegression().fit(X, y)
+    return model.coef_, float(model.intercept_)
+
+
+class ShardedLinearModel(BaseEstimator, RegressorMixin):
+    """One linear regression per value of a shard column (category or product), plus a global fallback.
+
+    Shards are fitted in parallel and stored together: coef_matrix_ holds one
+    row of coefficients per shard with the global model in the last row, and
+    shard_index_ maps shard values to rows. predict gathers each row's
+    coefficients and takes a row-wise dot product, so scoring stays a single
+    vectorized call however many shards there are. Unknown shards and shards
+    with fewer than `min_rows` training rows use the global model.
+    """
+
+    def __init__(self, shard_col: str = "product_category_name", min_rows: Optional[int] = None,
+                 n_jobs: Optional[int] = None, backend: str = "process"):
+        """
+        Args:
+        shard_col: str, feature whose (encoded) values define the shards.
+        min_rows: int, smallest shard given its own model (default: twice the number of coefficients).
+        n_jobs: int, workers used to fit the shards (default: CPU count).
+        backend: str, "process" or "thread".
+        """
+        self.shard_col = shard_col
+        self.min_rows = min_rows
+        self.n_jobs = n_jobs
+        self.backend = backend
+
+    def fit(self, X: pd.DataFrame, y):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        if self.shard_col not in X.columns:
+            raise ValueError(f"Shard column {self.shard_col!r} is not a feature.")
+        values = X.to_numpy(dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        shard = values[:, list(X.columns).index(self.shard_col)]
+
+        codes, keys = pd.factorize(shard, sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+        min_rows = self.min_rows or 2 * (self.n_features_in_ + 1)
+        groups = [(keys[i], order[bounds[i]:bounds[i + 1]]) for i in range(len(keys))
+                  if bounds[i + 1] - bounds[i] >= min_rows]
+
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        with _executor(n_jobs, self.backend) as pool:
+            fitted = pool.map(_fit_linear, (values[rows] for _, rows in groups), (y[rows] for _, rows in groups),
+                              chunksize=max(1, len(groups) // (4 * n_jobs)))
+            global_coef, global_intercept = _fit_linear(values, y)
+            fitted = list(fitted)
+
+        self.shard_index_ = pd.Index([key for key, _ in groups])
+        self.shard_sizes_ = np.array([len(rows) for _, rows in groups])
+        self.coef_matrix_ = np.vstack([coef for coef, _ in fitted] + [global_coef])
+        self.intercepts_ = np.array([b for _, b in fitted] + [global_intercept])
+        return self
+
+    def shard_rows(self, X) -> np.ndarray:
+        """Row of coef_matrix_ used for each sample (the last row = global fallback)."""
+        shard = np.asarray(X[self.shard_col] if hasattr(X, "columns")
+                           else np.asarray(X)[:, list(self.feature_names_in_).index(self.shard_col)], dtype=np.float64)
+        # get_indexer gives -1 for unseen shards, which is the global row
+        return self.shard_index_.get_indexer(shard)
+
+    def predict(self, X, chunk_size: int = 65_536) -> np.ndarray:
+        if hasattr(X, "columns"):
+            X = X[list(self.feature_names_in_)]
+        values = np.asarray(X, dtype=np.float64)
+        rows = self.shard_rows(values)
+        out = np.empty(len(values))
+        # Chunked so the gathered coefficients never exceed chunk_size x p
+        for start in range(0, len(values), chunk_size):
+            r = rows[start:start + chunk_size]
+            out[start:start + chunk_size] = (
+                np.einsum("ij,ij->i", values[start:start + chunk_size], self.coef_matrix_[r]) + self.intercepts_[r]
+            )
+        return out
+
+
+class ShardedLinearRegressionModel(Model):
+    """Per-category (or per-product) linear regressions."""
+
+    def __init__(self, X_train: pd.DataFrame, y_train: pd.Series, **kwargs):
+        """
+        Args:
+        X_train: pandas DataFrame, the training features (including the shard column).
+        y_train: pandas Series, the training target.
+        **kwargs: ShardedLinearModel options (shard_col, min_rows, n_jobs, backend).
+        """
+        self.X_train = X_train
+        self.y_train = y_train
+        self.model = ShardedLinearModel(**kwargs)
+
+    def train(self):
+        """Fits every shard and the global fallback."""
+        return self.model.fit(self.X_train, self.y_train)
+
+    def validate(self, k=10):
+        """Validates the model."""
+        mse_scorer = make_scorer(mean_squared_error)
+        mse_scores = cross_val_score(self.model, self.X_train, self.y_train, cv=k, scoring=mse_scorer)
+        print(f"Sharded RMSE: {sqrt(mse_scores.mean())}")
+        return sqrt(mse_scores.mean())
+
+
 class ModelFactory:
     """Model factory class."""
 
@@ -260,12 +546,92 @@ class ModelFactory:
         """Get the model of the given type."""
         if model_type == 'linear_regression':
             return LinearRegressionModel(*args, **kwargs)
+        elif model_type == 'incremental_ols':
+            return IncrementalLinearRegressionModel(*args, **kwargs)
+        elif model_type == 'sharded_linear':
+            return ShardedLinearRegressionModel(*args, **kwargs)
         elif model_type == 'baseline':
             return BaselineModel(*args, **kwargs)
         else:
             raise ValueError(f'Unknown model type: {model_type}')
 
 
+class CovarianceAccumulator:
+    """Column covariance / correlation accumulated over chunks in one pass.
+
+    Sums are taken around the first chunk's means, so large offsets (e.g.
+    year ~2017) don't cancel catastrophically when the mean is removed.
+    """
+
+    def __init__(self):
+        self.columns = None
+        self.n = 0
+        self.shift = None
+        self.sum = None
+        self.cross = None
+
+    def update(self, chunk: pd.DataFrame) -> "CovarianceAccumulator":
+        """Adds the rows of `chunk` (same columns for every chunk)."""
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        if self.shift is None:
+            self.shift = values.mean(axis=0)
+            self.sum = np.zeros(len(self.columns))
+            self.cross = np.zeros((len(self.columns), len(self.columns)))
+        values = values - self.shift
+        self.n += len(values)
+        self.sum += values.sum(axis=0)
+        self.cross += values.T @ values
+        return self
+
+    def covariance(self) -> pd.DataFrame:
+        mean = self.sum / self.n
+        cov = (self.cross - self.n * np.outer(mean, mean)) / (self.n - 1)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self) -> pd.DataFrame:
+        cov = self.covariance().to_numpy()
+        sd = np.sqrt(np.diag(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(sd, sd)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def vif_from_correlation(corr: pd.DataFrame) -> pd.Series:
+    """Variance inflation factors as the diagonal of the inverse correlation matrix.
+
+    Equivalent to statsmodels' variance_inflation_factor for each predictor of
+    a model with an intercept, without one regression per column. Constant
+    columns get NaN; exactly collinear sets get very large values (pseudo-inverse).
+    """
+    values = corr.to_numpy()
+    varying = np.isfinite(np.diag(values))
+    vif = np.full(len(values), np.nan)
+    if varying.any():
+        vif[varying] = np.diag(np.linalg.pinv(values[np.ix_(varying, varying)], hermitian=True))
+    return pd.Series(vif, index=corr.index, name="VIF")
+
+
+def _fold_gram(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Sufficient statistics of one fold: X'X, X'y and y'y."""
+    return X.T @ X, X.T @ y, float(y @ y)
+
+
+def _ols_fold_mse(X_train: np.ndarray, y_train: np.ndarray, X_test: np.ndarray, y_test: np.ndarray) -> float:
+    """Refits OLS on one fold's training rows and returns the test MSE."""
+    model = sm.OLS(y_train, X_train).fit()
+    return mean_squared_error(y_test, model.predict(X_test))
+
+
+def _executor(n_jobs: int, backend: str):
+    if backend == "thread":
+        return ThreadPoolExecutor(max_workers=n_jobs)
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers=n_jobs)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
 class ModelRefinement:
     """Singleton class for refining a given model."""
 
@@ -284,25 +650,72 @@ class ModelRefinement:
         self.rmse = None
 
     def remove_insignificant_vars(self, alpha=0.05):
-        """Remove insignificant variables based on p-value."""
-        summary = self.model.summary().tables[1]
-        summary_df = pd.DataFrame(summary.data)
-        summary_df.columns = summary_df.iloc[0]
-        summary_df = summary_df.drop(0)
-        summary_df = summary_df.set_index(summary_df.columns[0])
-        summary_df['P>|t|'] = summary_df['P>|t|'].astype(float)
-        significant_vars = [var for var in self.predictors if summary_df.loc[var, 'P>|t|'] < alpha]
+        """Remove insignificant variables based on p-value (one pass, from the fitted results)."""
+        pvalues = self.model.pvalues
+        significant_vars = [var for var in self.predictors if pvalues[var] < alpha]
         self.predictors = significant_vars
         return significant_vars
 
-    def check_multicollinearity(self):
-        """Check multicollinearity among predictors."""
-        exog = sm.add_constant(self.data[self.predictors])
-        vif = pd.Series([variance_inflation_factor(exog.values, i) 
-                         for i in range(exog.shape[1])], 
-                        index=exog.columns)
-        print("Variance Inflation Factors:")
-        print(vif)
+    def backward_eliminate(self, alpha=0.05):
+        """Repeatedly drop the least significant predictor until all p-values are below alpha.
+
+        Works on the fitted model's design matrix without refitting: (X'X)^-1
+        is taken once from a QR factorization, and dropping column j is a
+        rank-one downdate of it, G <- G[-j,-j] - G[-j,j] G[j,-j] / G[j,j], so
+        each step costs O(p^2). The intercept is never dropped.
+
+        Returns:
+            List[str]: The remaining predictors (also stored in self.predictors;
+            their final p-values are in self.pvalues).
+        """
+        names = list(self.model.model.exog_names)
+        X = np.asarray(self.model.model.exog, dtype=np.float64)
+        y = np.asarray(self.model.model.endog, dtype=np.float64)
+        n = len(y)
+
+        _, R = np.linalg.qr(X)
+        R_inv = np.linalg.pinv(R)
+        G = R_inv @ R_inv.T
+        xty = X.T @ y
+        yty = float(y @ y)
+
+        while True:
+            beta = G @ xty
+            df_resid = n - len(names)
+            sigma2 = (yty - beta @ xty) / df_resid
+            se = np.sqrt(np.maximum(sigma2 * np.diag(G), 0.0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pvalues = pd.Series(2 * student_t.sf(np.abs(beta / se), df_resid), index=names)
+            candidates = pvalues.drop("const", errors="ignore")
+            if candidates.empty or candidates.max() < alpha:
+                break
+            j = names.index(candidates.idxmax())
+            keep = [i for i in range(len(names)) if i != j]
+            G = G[np.ix_(keep, keep)] - np.outer(G[keep, j], G[j, keep]) / G[j, j]
+            xty = xty[keep]
+            del names[j]
+
+        self.pvalues = pvalues
+        self.predictors = [x for x in names if x != 'const']
+        return self.predictors
+
+    def check_multicollinearity(self, chunks: Optional[Iterable[pd.DataFrame]] = None) -> pd.Series:
+        """Variance inflation factor of each predictor.
+
+        All VIFs come from one inverse of the predictors' correlation matrix
+        (the intercept is implied, so no row for const).
+
+        Args:
+            chunks: Optional iterable of DataFrames to accumulate the
+                correlation from instead of self.data, for data that doesn't
+                fit in memory.
+        """
+        if chunks is None:
+            chunks = [self.data[self.predictors]]
+        acc = CovarianceAccumulator()
+        for chunk in chunks:
+            acc.update(chunk[self.predictors])
+        return vif_from_correlation(acc.correlation())
 
     def check_normality_of_residuals(self):
         """Check normality of residuals."""
@@ -327,20 +740,72 @@ class ModelRefinement:
         plt.title('Residual vs. Predicted')
         plt.show()
 
-    def validate(self, k=10):
-        """Validate the model using K-Fold cross-validation."""
-        kf = KFold(n_splits=k)
-        y = self.data[self.target]
-        X = sm.add_constant(self.data[self.predictors])
-        errors = []
-        
-        for train, test in kf.split(X):
-            model = sm.OLS(y.iloc[train], X.iloc[train]).fit()
-            predictions = model.predict(X.iloc[test])
-            mse = mean_squared_error(y.iloc[test], predictions)
-            errors.append(mse) 
-            print(f"MSE: {mse}")
-        
+    def validate(self, k=10, n_repeats=1, n_jobs=1, backend="thread", method="auto", random_state=None):
+        """Validate the model using (repeated) K-Fold cross-validation.
+
+        With method="sufficient_stats" (the default for OLS) X'X, X'y and y'y
+        are computed once per fold; each fold's training solution is the
+        total minus that fold, and its test MSE follows from the same
+        statistics, so the whole k-fold run is about one pass over the data.
+        method="refit" fits sm.OLS per fold as before.
+
+        Args:
+            k: Number of folds.
+            n_repeats: Repeat k-fold with a different shuffle each time
+                (1 keeps the original unshuffled folds).
+            n_jobs: Workers used for the per-fold work.
+            backend: "thread" or "process".
+            method: "auto", "sufficient_stats" or "refit".
+            random_state: Seed for the repeated shuffles.
+
+        Returns:
+            float: RMSE over all folds (and repeats).
+        """
+        if method == "auto":
+            method = "sufficient_stats"
+        if method not in ("sufficient_stats", "refit"):
+            raise ValueError(f"Unknown method: {method}")
+
+        y = self.data[self.target].to_numpy(dtype=np.float64)
+        X = sm.add_constant(self.data[self.predictors], has_constant="add").to_numpy(dtype=np.float64)
+        if method == "sufficient_stats":
+            # Standardize (same affine map for every fold, so predictions are
+            # unchanged) to keep X'X well conditioned, e.g. year ~2017 next to the constant
+            scale = X.std(axis=0)
+            constant = scale == 0
+            center = np.where(constant, 0.0, X.mean(axis=0))
+            X = (X - center) / np.where(constant, 1.0, scale)
+        if n_repeats == 1:
+            splits = list(KFold(n_splits=k).split(X))
+        else:
+            splits = list(RepeatedKFold(n_splits=k, n_repeats=n_repeats, random_state=random_state).split(X))
+
+        with _executor(n_jobs, backend) as pool:
+            if method == "refit":
+                errors = list(pool.map(
+                    _ols_fold_mse,
+                    (X[train] for train, _ in splits),
+                    (y[train] for train, _ in splits),
+                    (X[test] for _, test in splits),
+                    (y[test] for _, test in splits),
+                ))
+            else:
+                grams = list(pool.map(_fold_gram, (X[test] for _, test in splits), (y[test] for _, test in splits)))
+                errors = []
+                # Folds of one repeat partition the data, so their sums are the full-data statistics
+                for r in range(0, len(splits), k):
+                    repeat = grams[r:r + k]
+                    xtx = sum(g[0] for g in repeat)
+                    xty = sum(g[1] for g in repeat)
+                    for (_, test), (fold_xtx, fold_xty, fold_yty) in zip(splits[r:r + k], repeat):
+                        beta = np.linalg.lstsq(xtx - fold_xtx, xty - fold_xty, rcond=None)[0]
+                        sse = fold_yty - 2 * beta @ fold_xty + beta @ fold_xtx @ beta
+                        errors.append(max(sse, 0.0) / len(test))
+
+        if n_repeats == 1:
+            for mse in errors:
+                print(f"MSE: {mse}")
+        self.cv_errors = errors
         rmse = np.sqrt(np.mean(errors))
         self.rmse = rmse
         return rmse
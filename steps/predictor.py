@@ -1,16 +1,48 @@
+from typing import Optional
+
 from zenml import step
 import pandas as pd
 import numpy as np
 from zenml.integrations.mlflow.services import MLFlowDeploymentService
 
+from serving.transport import DEFAULT_CHUNK_ROWS, PredictionClient, chunked_service_predict
+
 @step(enable_cache=False)
 def predictor(
     service: MLFlowDeploymentService,
     data: pd.DataFrame,
+    transport: str = "json",
+    prediction_url: Optional[str] = None,
+    chunk_rows: Optional[int] = None,
+    max_concurrency: int = 4,
 ) -> np.ndarray:
-    """Run an inference request against a prediction service"""
+    """Run an inference request against a prediction service
+
+    Args:
+        service: Deployed MLflow prediction service.
+        data: Rows to score (predictor columns).
+        transport: "json" (MLflow's split orientation) or "npy" / "arrow" to
+            send binary buffers to an endpoint that accepts them (see
+            serving/stand_in_server.py).
+        prediction_url: Endpoint for the binary transports (defaults to the
+            service's prediction_url).
+        chunk_rows: Split the input into chunks of this many rows, sent as
+            concurrent requests and reassembled in order.
+        max_concurrency: Chunk requests in flight at once.
+    """
 
     service.start(timeout=10)  # should be a NOP if already started
-    data = data.to_json(orient="split")
-    prediction = service.predict(data)
-    return prediction
+    if transport == "json":
+        if chunk_rows:
+            return chunked_service_predict(service, data, chunk_rows, max_concurrency)
+        data = data.to_json(orient="split")
+        prediction = service.predict(data)
+        return prediction
+
+    with PredictionClient(
+        prediction_url or service.prediction_url,
+        fmt=transport,
+        chunk_rows=chunk_rows or DEFAULT_CHUNK_ROWS,
+        max_concurrency=max_concurrency,
+    ) as client:
+        return client.predict(data)
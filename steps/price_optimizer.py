@@ -0,0 +1,245 @@
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Bound = Optional[Union[str, float, np.ndarray]]
+
+
+def predict_matrix(model, X: np.ndarray, predictors: Sequence[str]) -> np.ndarray:
+    """Runs one predict call on a float matrix laid out in `predictors` order.
+
+    Models fitted on DataFrames get a DataFrame view (no copy) so sklearn's
+    feature-name check passes; everything else gets the raw array.
+    """
+    if getattr(model, "feature_names_in_", None) is not None:
+        X = pd.DataFrame(X, columns=list(predictors), copy=False)
+    return np.asarray(model.predict(X), dtype=np.float64).reshape(-1)
+
+
+def linear_coefficients(model, predictors: Sequence[str]) -> Optional[Tuple[np.ndarray, float]]:
+    """Returns (coef, intercept) aligned to `predictors` for single-output linear models, else None."""
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None or np.ndim(coef) != 1 or np.ndim(intercept) != 0:
+        return None
+    coef = np.asarray(coef, dtype=np.float64)
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        position = {name: i for i, name in enumerate(names)}
+        if set(position) != set(predictors):
+            return None
+        coef = coef[[position[col] for col in predictors]]
+    elif len(coef) != len(predictors):
+        return None
+    return coef, float(intercept)
+
+
+class PriceOptimizer:
+    """Finds the revenue- or margin-maximizing unit price for each product.
+
+    Two solvers share the same bounds:
+    - "grid": every product row is expanded into a grid of candidate prices
+      (products x price points), the price-dependent features are re-derived
+      for each candidate and the whole grid is scored in a single vectorized
+      `predict` call per chunk. Works for any model.
+    - "closed_form": for linear models qty(price) = base + slope * price, so
+      revenue is a quadratic in price whose optimum is solved per product and
+      clipped to the bounds. No candidate grid is scored.
+    method="auto" picks closed_form when the model exposes coef_/intercept_.
+    """
+
+    def __init__(
+        self,
+        model,
+        predictors: Sequence[str],
+        objective: str = "revenue",
+        method: str = "auto",
+        n_points: int = 51,
+        price_range: Tuple[float, float] = (0.7, 1.3),
+        min_price: Bound = None,
+        max_price: Bound = None,
+        comp_bounds: Optional[Tuple[float, float]] = None,
+        comp_cols: Sequence[str] = ("comp_1", "comp_2", "comp_3"),
+        unit_cost: Bound = None,
+        chunk_size: int = 100_000,
+        price_col: str = "unit_price",
+        scaled_cols: Sequence[str] = ("total_price",),
+        lag_col: Optional[str] = "lag_price",
+    ):
+        """
+        Args:
+        model: fitted estimator predicting qty from `predictors`.
+        predictors: list of str, feature columns in the order the model expects.
+        objective: str, "revenue" (price * qty) or "margin" ((price - unit_cost) * qty).
+        method: str, "auto", "grid" or "closed_form".
+        n_points: int, number of candidate prices per product (grid only).
+        price_range: tuple of float, allowed prices as multiples of the current price.
+        min_price, max_price: column name, scalar or per-row array of absolute price limits.
+        comp_bounds: tuple of float, allowed prices as multiples of the mean competitor
+            price (`comp_cols`). Rows without competitor prices, or where these
+            bounds conflict with the others, ignore them.
+        comp_cols: competitor price columns in `df`.
+        unit_cost: column name, scalar or per-row array of unit costs (required for "margin").
+        chunk_size: int, max products scored per predict call (bounds memory to chunk_size * n_points rows).
+        price_col: str, the price being optimized.
+        scaled_cols: columns that move proportionally with the price (total_price = qty * unit_price).
+        lag_col: str, previous-period price; set to the current price since the candidate is next period's price.
+        """
+        if objective not in ("revenue", "margin"):
+            raise ValueError(f"Unknown objective: {objective}")
+        if objective == "margin" and unit_cost is None:
+            raise ValueError("unit_cost is required for the margin objective.")
+        if method not in ("auto", "grid", "closed_form"):
+            raise ValueError(f"Unknown method: {method}")
+        self.predictors = list(predictors)
+        if price_col not in self.predictors:
+            raise ValueError(f"'{price_col}' is not one of the model predictors.")
+
+        self.model = model
+        self.objective = objective
+        self.n_points = n_points
+        self.price_range = price_range
+        self.min_price = min_price
+        self.max_price = max_price
+        self.comp_bounds = comp_bounds
+        self.comp_cols = list(comp_cols)
+        self.unit_cost = unit_cost
+        self.chunk_size = chunk_size
+        self.price_col = price_col
+        self.scaled_cols = [c for c in scaled_cols if c in self.predictors]
+        self.lag_col = lag_col if lag_col in self.predictors else None
+
+        self.linear = linear_coefficients(model, self.predictors)
+        if method == "closed_form" and self.linear is None:
+            raise ValueError("closed_form requires a linear model with coef_ and intercept_.")
+        if method == "auto":
+            method = "closed_form" if self.linear is not None else "grid"
+        self.method = method
+
+    @staticmethod
+    def _column(df: pd.DataFrame, value: Bound, default: float) -> np.ndarray:
+        """Resolves a column name / scalar / array option to a per-row float array."""
+        if value is None:
+            return np.full(len(df), default)
+        if isinstance(value, str):
+            return df[value].to_numpy(dtype=np.float64)
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (len(df),))
+
+    def price_bounds(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-row [low, high] price bounds from the range, absolute and competitor limits."""
+        current = df[self.price_col].to_numpy(dtype=np.float64)
+        low = np.maximum(current * self.price_range[0], self._column(df, self.min_price, 0.0))
+        high = np.minimum(current * self.price_range[1], self._column(df, self.max_price, np.inf))
+        high = np.maximum(high, low)
+
+        comp_cols = [c for c in self.comp_cols if c in df.columns]
+        if self.comp_bounds is not None and comp_cols:
+            comps = df[comp_cols].to_numpy(dtype=np.float64)
+            comps = np.where(comps > 0, comps, np.nan)
+            has_comp = ~np.isnan(comps).all(axis=1)
+            reference = np.nanmean(np.where(has_comp[:, None], comps, 1.0), axis=1)
+            comp_low = np.maximum(low, reference * self.comp_bounds[0])
+            comp_high = np.minimum(high, reference * self.comp_bounds[1])
+            usable = has_comp & (comp_low <= comp_high)
+            low = np.where(usable, comp_low, low)
+            high = np.where(usable, comp_high, high)
+        return low, high
+
+    def _objective(self, prices: np.ndarray, qty: np.ndarray, cost: np.ndarray) -> np.ndarray:
+        if self.objective == "margin":
+            return (prices - cost) * qty
+        return prices * qty
+
+    def _grid_chunk(self, X, low, high, cost) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Scores one (products x price points) block plus the current price in a single predict call."""
+        n = len(X)
+        col = {name: i for i, name in enumerate(self.predictors)}
+        current = X[:, col[self.price_col]]
+
+        steps = np.linspace(0.0, 1.0, self.n_points)
+        prices = np.hstack([low[:, None] + (high - low)[:, None] * steps[None, :], current[:, None]])
+        g = prices.shape[1]
+        ratio = np.divide(prices, current[:, None], out=np.ones_like(prices), where=current[:, None] != 0)
+
+        grid = np.repeat(X, g, axis=0)
+        grid[:, col[self.price_col]] = prices.ravel()
+        for name in self.scaled_cols:
+            grid[:, col[name]] = (X[:, col[name]][:, None] * ratio).ravel()
+        if self.lag_col is not None:
+            grid[:, col[self.lag_col]] = np.repeat(current, g)
+
+        qty = np.clip(predict_matrix(self.model, grid, self.predictors).reshape(n, g), 0.0, None)
+        value = self._objective(prices, qty, cost[:, None])
+
+        rows = np.arange(n)
+        best = value[:, :-1].argmax(axis=1)
+        return prices[rows, best], qty[rows, best], value[rows, best], value[:, -1]
+
+    def _closed_form(self, X, low, high, cost) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Solves max price * (base + slope * price) per row, clipped to [low, high]."""
+        coef, intercept = self.linear
+        col = {name: i for i, name in enumerate(self.predictors)}
+        current = X[:, col[self.price_col]]
+
+        # qty(p) = base + slope * p once price-dependent features are expressed in p
+        fixed = X.copy()
+        fixed[:, col[self.price_col]] = 0.0
+        slope = np.full(len(X), coef[col[self.price_col]])
+        for name in self.scaled_cols:
+            fixed[:, col[name]] = 0.0
+            per_unit = np.divide(X[:, col[name]], current, out=np.zeros_like(current), where=current != 0)
+            slope += coef[col[name]] * per_unit
+        if self.lag_col is not None:
+            fixed[:, col[self.lag_col]] = current
+        base = fixed @ coef + intercept
+
+        def value_at(p):
+            qty = np.clip(base + slope * p, 0.0, None)
+            return qty, self._objective(p, qty, cost)
+
+        # Concave (slope < 0): stationary point clipped to bounds. Otherwise the best bound wins.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stationary = (slope * cost - base) / (2.0 * slope) if self.objective == "margin" else -base / (2.0 * slope)
+        _, value_low = value_at(low)
+        _, value_high = value_at(high)
+        endpoint = np.where(value_high > value_low, high, low)
+        price = np.where(slope < 0, np.clip(stationary, low, high), endpoint)
+
+        qty, value = value_at(price)
+        _, current_value = value_at(current)
+        return price, qty, value, current_value
+
+    def optimize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Finds the best price for every row of `df`.
+
+        Args:
+        df: pandas DataFrame, product rows preprocessed like the training data
+            (must contain every predictor).
+
+        Returns:
+        pandas DataFrame indexed like `df` with the current and optimal price,
+        the predicted qty at the optimum and the objective at both prices.
+        """
+        X_all = df[self.predictors].to_numpy(dtype=np.float64)
+        cost_all = self._column(df, self.unit_cost, 0.0)
+        low_all, high_all = self.price_bounds(df)
+        solve = self._closed_form if self.method == "closed_form" else self._grid_chunk
+
+        out = np.empty((4, len(df)))
+        for start in range(0, len(df), self.chunk_size):
+            stop = start + self.chunk_size
+            results = solve(X_all[start:stop], low_all[start:stop], high_all[start:stop], cost_all[start:stop])
+            for i, values in enumerate(results):
+                out[i, start:stop] = values
+
+        return pd.DataFrame(
+            {
+                "current_price": X_all[:, self.predictors.index(self.price_col)],
+                "optimal_price": out[0],
+                "expected_qty": out[1],
+                f"expected_{self.objective}": out[2],
+                f"current_{self.objective}": out[3],
+            },
+            index=df.index,
+        )
@@ -1,24 +1,31 @@
 import pandas as pd
 from zenml import step
-from sklearn.preprocessing import LabelEncoder
 from typing_extensions import Annotated
 from typing import Tuple
 
+from steps.encoders import ENCODED_COLUMNS, ENCODERS_PATH, EncoderSet
+from steps.feature_transform import FEATURE_TRANSFORM_PATH, TARGET, FeatureTransform, date_features
+from steps.step_cache import cached_step
+
 @step
-def categorical_encode(df: pd.DataFrame) -> pd.DataFrame:
+def categorical_encode(df: pd.DataFrame, fit: bool = True, encoders_path: str = ENCODERS_PATH) -> pd.DataFrame:
     """
     Encodes categorical columns.
     
     Args:
         df: Raw DataFrame.
+        fit: Fit new encoders and persist them to `encoders_path` (training).
+            When False, the persisted encoders are applied as-is (inference);
+            unseen categories map to the unknown code.
+        encoders_path: Where the fitted encoders live, next to model.pkl.
     """
     try:
-        cols_to_encode = ["product_id", "product_category_name", "product_score"]
-        for col in cols_to_encode:
-            if col in df.columns:
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col])
-        return df
+        if fit:
+            encoders = EncoderSet().fit(df, ENCODED_COLUMNS)
+            encoders.save(encoders_path)
+        else:
+            encoders = EncoderSet.load(encoders_path)
+        return encoders.transform(df)
     except Exception as e:
         raise e
 
@@ -33,10 +40,9 @@ def feature_engineer(df: pd.DataFrame) -> pd.DataFrame:
     try:
         # Check if month_year needs to be processed
         if "month_year" in df.columns:
-            df["month_year"] = pd.to_datetime(df["month_year"])
-            df["month"] = df["month_year"].dt.month
-            df["year"] = df["month_year"].dt.year
-            df["is_weekend"] = df["month_year"].dt.dayofweek > 4
+            # Parsed once per distinct month, not per row
+            for name, values in date_features(df["month_year"]).items():
+                df[name] = values
             
             # Drop original date extraction if redundant or keep for reference
             # For this model, we likely want to drop the timestamp itself for regression
@@ -49,7 +55,8 @@ def feature_engineer(df: pd.DataFrame) -> pd.DataFrame:
         raise e
 
 @step
-def process_data(df: pd.DataFrame) -> Tuple[
+@cached_step(depends_on=["steps.feature_transform", "steps.encoders"], files=lambda args: [args["transform_path"]])
+def process_data(df: pd.DataFrame, transform_path: str = FEATURE_TRANSFORM_PATH) -> Tuple[
     Annotated[pd.DataFrame, "X_train"],
     Annotated[pd.DataFrame, "X_test"],
     Annotated[pd.Series, "y_train"],
@@ -57,20 +64,18 @@ def process_data(df: pd.DataFrame) -> Tuple[
 ]:
     """
     Process, encode and split data.
+
+    Fits the FeatureTransform (encoding, date features, imputation, column
+    selection in one pass), persists it next to model.pkl for inference and
+    the app, then splits.
     """
-    df = categorical_encode.entrypoint(df)
-    df = feature_engineer.entrypoint(df)
-    
     from sklearn.model_selection import train_test_split
-    
-    # Assuming 'qty' is the target based on other files
-    target = "qty"
-    if target not in df.columns:
-        # Fallback or error
-        pass
-        
-    X = df.drop(columns=[target], errors='ignore')
-    y = df[target]
+
+    transform = FeatureTransform(target=TARGET).fit(df)
+    transform.save(transform_path)
+
+    X = transform.transform_frame(df)
+    y = df[TARGET]
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     return X_train, X_test, y_train, y_test
@@ -0,0 +1,200 @@
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), ".cache", "steps")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+Files = Union[Iterable[str], Callable[[Dict[str, Any]], Iterable[str]]]
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Content hash of a step input.
+
+    DataFrames and Series are hashed row by row with pandas (plus column names
+    and dtypes), arrays by their bytes, and anything else (e.g. fitted models)
+    with joblib.hash, which is stable across a pickle round trip.
+    """
+    h = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        h.update(json.dumps([list(map(str, value.columns)), list(map(str, value.dtypes))]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(json.dumps([str(value.name), str(value.dtype)]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        h.update(repr(value).encode())
+    else:
+        h.update(joblib.hash(value).encode())
+    return h.hexdigest()
+
+
+def code_hash(func: Callable, depends_on: Iterable[str] = ()) -> str:
+    """Hash of the source of the module defining `func` and of the modules it depends on."""
+    h = hashlib.sha256()
+    for name in [func.__module__, *depends_on]:
+        module = sys.modules.get(name) or __import__(name, fromlist=["_"])
+        try:
+            h.update(inspect.getsource(module).encode())
+        except (OSError, TypeError):
+            h.update(name.encode())
+    return h.hexdigest()
+
+
+class StepCache:
+    """
+    Content-addressed results on local disk with size-bounded LRU eviction.
+
+    Each entry is one joblib file holding the step's return value and the
+    bytes of any files the step writes (e.g. model.pkl), so a hit can restore
+    them. Reading an entry refreshes its mtime; when the directory grows past
+    `max_bytes` the least recently used entries are removed.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("STEP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.joblib")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            entry = joblib.load(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)
+        return entry
+
+    def put(self, key: str, entry: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        joblib.dump(entry, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.evict()
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits in max_bytes. Returns the number removed."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".joblib"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Deletes every entry. Returns the number removed."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        names = [n for n in os.listdir(self.cache_dir) if n.endswith(".joblib")]
+        for name in names:
+            os.remove(os.path.join(self.cache_dir, name))
+        return len(names)
+
+
+def cached_step(
+    depends_on: Iterable[str] = (),
+    files: Files = (),
+    key_fn: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    cache: Optional[StepCache] = None,
+    on_hit: Optional[Callable[[Any, Dict[str, Any]], None]] = None,
+    bypass: Optional[Callable[[Dict[str, Any]], bool]] = None,
+):
+    """
+    Caches a step function's result by input fingerprints + code hash + parameters.
+
+    Apply under @step. The key covers every argument (DataFrames are hashed
+    by content), the source of the step's module and of `depends_on`, and
+    whatever `key_fn` returns for inputs that live outside the arguments (e.g.
+    a database table's fingerprint). On a hit the stored result is returned
+    and the files the step writes are restored; other side effects (e.g.
+    MLflow logging) only happen if `on_hit` replays them. Set STEP_CACHE=0
+    to bypass.
+
+    Args:
+        depends_on: Extra modules whose source is part of the key.
+        files: Paths the step writes, or a function of the bound arguments
+            returning them; saved with the entry and restored on a hit.
+        key_fn: Function of the bound arguments returning extra key material.
+        cache: StepCache to use (default: .cache/steps under the working directory).
+        on_hit: Called with the cached value and the bound arguments on a hit,
+            to redo side effects the step would have had (e.g. re-log metrics
+            to the current MLflow run).
+        bypass: Function of the bound arguments; when it returns True the step
+            runs uncached (e.g. for modes that keep their own state).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        code = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal code
+            if os.getenv("STEP_CACHE", "1") == "0":
+                return func(*args, **kwargs)
+            store = cache or StepCache()
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if bypass is not None and bypass(arguments):
+                return func(*args, **kwargs)
+
+            if code is None:
+                code = code_hash(func, depends_on)
+            parts = {
+                "step": f"{func.__module__}.{func.__qualname__}",
+                "code": code,
+                "args": {name: fingerprint(value) for name, value in arguments.items()},
+            }
+            if key_fn is not None:
+                parts["extra"] = fingerprint(key_fn(arguments))
+            key = hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:32]
+            paths: List[str] = list(files(arguments) if callable(files) else files)
+
+            entry = store.get(key)
+            if entry is not None:
+                for path, data in entry["files"].items():
+                    with open(path, "wb") as f:
+                        f.write(data)
+                logging.info(f"{func.__name__}: cache hit ({key}).")
+                if on_hit is not None:
+                    on_hit(entry["value"], arguments)
+                return entry["value"]
+
+            value = func(*args, **kwargs)
+            saved = {}
+            for path in paths:
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        saved[path] = f.read()
+            store.put(key, {"value": value, "files": saved})
+            return value
+
+        return wrapper
+
+    return decorator
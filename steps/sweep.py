@@ -0,0 +1,188 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Value, shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.dummy import DummyRegressor
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.model_selection import KFold, ParameterGrid
+
+# family -> (estimator factory, parameter grid). Factories must be importable
+# (classes or module-level functions) so process-pool workers can unpickle them.
+ESTIMATORS: Dict[str, Tuple[Callable[..., Any], Dict[str, List[Any]]]] = {
+    "baseline": (DummyRegressor, {"strategy": ["mean", "median"]}),
+    "linear_regression": (LinearRegression, {}),
+    "ridge": (Ridge, {"alpha": [0.01, 0.1, 1.0, 10.0, 100.0]}),
+    "lasso": (Lasso, {"alpha": [0.001, 0.01, 0.1, 1.0], "max_iter": [5000]}),
+    "gbr": (
+        GradientBoostingRegressor,
+        {"n_estimators": [100, 300], "learning_rate": [0.05, 0.1], "max_depth": [2, 3], "random_state": [42]},
+    ),
+}
+
+# Per-worker views of the shared training data (set by _attach)
+_shared: Dict[str, Any] = {}
+
+
+def register_estimator(name: str, factory: Callable[..., Any], grid: Optional[Dict[str, List[Any]]] = None):
+    """Adds (or replaces) an estimator family available to run_sweep."""
+    ESTIMATORS[name] = (factory, grid or {})
+
+
+def trials(families: Optional[Iterable[str]] = None) -> List[Tuple[str, dict]]:
+    """Expands the parameter grids of `families` (all registered by default) into (family, params) pairs."""
+    families = list(families) if families is not None else list(ESTIMATORS)
+    unknown = [f for f in families if f not in ESTIMATORS]
+    if unknown:
+        raise ValueError(f"Unknown estimator families: {unknown}")
+    return [(family, params) for family in families for params in ParameterGrid(ESTIMATORS[family][1])]
+
+
+def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, tuple, str]]:
+    """Copies `array` into a new shared memory block; returns the block and what workers need to attach."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach(specs: Dict[str, Tuple[str, tuple, str]], best):
+    """Pool initializer: maps the shared X / y / fold ids without copying them."""
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[f"_{key}_shm"] = shm
+        _shared[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    _shared["best"] = best
+
+
+def _run_trial(family: str, params: dict, prune_factor: Optional[float], min_folds: int) -> dict:
+    """Cross-validates one trial on the shared data, stopping early if it can't compete."""
+    X, y, folds, best = _shared["X"], _shared["y"], _shared["folds"], _shared["best"]
+    factory = ESTIMATORS[family][0]
+    k = int(folds.max()) + 1
+    start = time.perf_counter()
+    errors = []
+    pruned = False
+    for fold in range(k):
+        test = folds == fold
+        model = factory(**params).fit(X[~test], y[~test])
+        errors.append(float(np.mean((model.predict(X[test]) - y[test]) ** 2)))
+        # Prune when the running mean is already well past the best completed trial
+        if (prune_factor is not None and len(errors) >= min_folds and fold < k - 1
+                and np.mean(errors) > prune_factor * best.value):
+            pruned = True
+            break
+    mse = float(np.mean(errors))
+    if not pruned:
+        with best.get_lock():
+            best.value = min(best.value, mse)
+    return {
+        "family": family,
+        "params": params,
+        "cv_rmse": float(np.sqrt(mse)),
+        "folds": len(errors),
+        "pruned": pruned,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _log_trial(mlflow, result: dict):
+    with mlflow.start_run(run_name=result["family"], nested=True):
+        mlflow.log_param("family", result["family"])
+        mlflow.log_params(result["params"])
+        mlflow.log_metric("cv_rmse", result["cv_rmse"])
+        mlflow.log_metric("folds", result["folds"])
+        mlflow.log_metric("seconds", result["seconds"])
+        mlflow.set_tag("pruned", str(result["pruned"]))
+
+
+def run_sweep(
+    X: pd.DataFrame,
+    y: pd.Series,
+    families: Optional[Iterable[str]] = None,
+    k: int = 5,
+    n_jobs: Optional[int] = None,
+    prune_factor: Optional[float] = 1.5,
+    min_folds: int = 2,
+    log_to_mlflow: bool = True,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Cross-validates every trial of the selected estimator families in parallel.
+
+    X, y and the fold assignment are placed in shared memory once and mapped
+    by each worker, so the training data isn't pickled per trial. After
+    `min_folds` folds a trial whose running MSE exceeds `prune_factor` times
+    the best completed trial's MSE (shared across workers) is stopped.
+    With `log_to_mlflow` each trial is logged as a nested MLflow run
+    (under the active run, if any).
+
+    Args:
+        X: Training features.
+        y: Training target.
+        families: Estimator families to sweep (default: all in ESTIMATORS).
+        k: Number of folds.
+        n_jobs: Worker processes (default: CPU count; 1 runs in-process).
+        prune_factor: Pruning threshold relative to the best MSE; None disables pruning.
+        min_folds: Folds every trial completes before it can be pruned.
+        log_to_mlflow: Log one nested run per trial.
+        random_state: Seed of the shuffled folds.
+
+    Returns:
+        pd.DataFrame: One row per trial (family, params, cv_rmse, folds,
+        pruned, seconds), best completed trial first.
+    """
+    todo = trials(families)
+    values = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+    target = np.ascontiguousarray(np.asarray(y, dtype=np.float64))
+    folds = np.empty(len(values), dtype=np.int16)
+    for fold, (_, test) in enumerate(KFold(n_splits=k, shuffle=True, random_state=random_state).split(values)):
+        folds[test] = fold
+
+    mlflow = None
+    if log_to_mlflow:
+        import mlflow
+
+    best = Value("d", np.inf)
+    blocks, specs = [], {}
+    try:
+        for key, array in (("X", values), ("y", target), ("folds", folds)):
+            shm, specs[key] = _share(array)
+            blocks.append(shm)
+
+        results = []
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs == 1:
+            _attach(specs, best)
+            for family, params in todo:
+                results.append(_run_trial(family, params, prune_factor, min_folds))
+                if mlflow is not None:
+                    _log_trial(mlflow, results[-1])
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach, initargs=(specs, best)) as pool:
+                futures = [pool.submit(_run_trial, family, params, prune_factor, min_folds) for family, params in todo]
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    if mlflow is not None:
+                        _log_trial(mlflow, results[-1])
+    finally:
+        for key in [key for key in _shared if key.endswith("_shm")]:
+            _shared[key].close()
+        _shared.clear()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    return pd.DataFrame(results).sort_values(["pruned", "cv_rmse"], ignore_index=True)
+
+
+def best_estimator(results: pd.DataFrame, X: pd.DataFrame, y: pd.Series):
+    """Refits the best completed trial of a sweep on the full training data."""
+    completed = results[~results["pruned"]]
+    if completed.empty:
+        raise ValueError("No completed trials in the sweep results.")
+    top = completed.iloc[0]
+    return ESTIMATORS[top["family"]][0](**top["params"]).fit(X, y)
@@ -1,4 +1,6 @@
-from typing import List, Tuple
+import os
+from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from typing_extensions import Annotated
 from zenml import step
@@ -6,13 +8,45 @@ from zenml.logger import get_logger
 import mlflow
 import mlflow.sklearn
 from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-from steps.model_building import LinearRegressionModel
+from data.managament.engines import get_engine
+from steps.feature_transform import FEATURE_TRANSFORM_PATH, FeatureTransform
+from steps.ingest_data import DEFAULT_CHUNKSIZE, iter_table_chunks
+from steps.model_building import IncrementalOLS, LinearRegressionModel, ModelFactory
+from steps.step_cache import cached_step
+from steps.sweep import best_estimator, run_sweep
 
 logger = get_logger(__name__)
 
+
+def log_cached_model(result: Tuple[LinearRegression, List[str]], arguments: dict):
+    """
+    Replays what mlflow.sklearn.autolog records for train_model on a step cache hit.
+
+    Logs the estimator's params, the training metrics autolog computes and the
+    model under the "model" artifact path, where the MLflow deployer looks
+    for it, so a cached run is tracked like a trained one.
+    """
+    model, _ = result
+    X_train, y_train = arguments["X_train"], arguments["y_train"]
+    prediction = model.predict(X_train)
+    mse = mean_squared_error(y_train, prediction)
+    mlflow.log_params(model.get_params())
+    mlflow.log_metrics({
+        "training_mean_squared_error": mse,
+        "training_root_mean_squared_error": float(np.sqrt(mse)),
+        "training_mean_absolute_error": mean_absolute_error(y_train, prediction),
+        "training_r2_score": r2_score(y_train, prediction),
+        "training_score": model.score(X_train, y_train),
+    })
+    mlflow.set_tag("step_cache", "hit")
+    mlflow.sklearn.log_model(model, "model")
+
+
 @step(experiment_tracker="mlflow_tracker",
       settings={"experiment_tracker.mlflow": {"experiment_name": "retail_price_optimization"}})
+@cached_step(files=["model.pkl", "predictors.pkl"], on_hit=log_cached_model)
 def train_model(
     X_train: Annotated[pd.DataFrame, "X_train"],
     y_train: Annotated[pd.Series, "y_train"]
@@ -48,3 +82,111 @@ def train_model(
     except Exception as e:
         logger.error(e)
         raise e
+
+
+@step(experiment_tracker="mlflow_tracker",
+      settings={"experiment_tracker.mlflow": {"experiment_name": "retail_price_optimization"}})
+def train_model_incremental(
+    table_name: str = "retail_prices",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    warm_start: bool = False,
+    transform_path: str = FEATURE_TRANSFORM_PATH,
+    model_path: str = "model.pkl",
+) -> Tuple[
+    Annotated[IncrementalOLS, "model"],
+    Annotated[List[str], "predictors"],
+]:
+    """
+    Trains OLS out of core, streaming the table in chunks.
+
+    Each chunk is transformed with the persisted FeatureTransform and added to
+    an IncrementalOLS, so memory is bounded by the chunk size. With warm_start
+    the model in `model_path` is updated with rows past the last id it has
+    seen (e.g. a new month) without re-reading history.
+
+    Args:
+        table_name: Table to train on.
+        chunksize: Rows per streamed chunk.
+        warm_start: Continue the IncrementalOLS saved at `model_path`.
+        transform_path: Fitted FeatureTransform (from process_data).
+        model_path: Where the model is read from (warm start) and saved.
+    """
+    try:
+        import joblib
+
+        if not os.path.exists(transform_path):
+            raise FileNotFoundError(f"{transform_path} not found; fit it with process_data first.")
+        transform = FeatureTransform.load(transform_path)
+
+        model, after = None, None
+        if warm_start and os.path.exists(model_path):
+            previous = joblib.load(model_path)
+            if isinstance(previous, IncrementalOLS) and getattr(previous, "last_id_", None) is not None:
+                model, after = previous, ("id", previous.last_id_)
+            else:
+                logger.warning(f"{model_path} is not an IncrementalOLS; training from scratch.")
+
+        engine = get_engine(os.getenv("DB_URL"))
+        chunks = iter_table_chunks(engine, table_name, chunksize=chunksize, after=after)
+        last_id = after[1] if after else None
+
+        def training_chunks():
+            nonlocal last_id
+            for chunk in chunks:
+                last_id = int(chunk["id"].max()) if last_id is None else max(last_id, int(chunk["id"].max()))
+                yield transform.transform_frame(chunk), chunk[transform.target]
+
+        seen = model.n_samples_seen_ if model is not None else 0
+        model = ModelFactory.get_model("incremental_ols", chunks=training_chunks(), model=model).train()
+        if not hasattr(model, "coef_"):
+            raise ValueError(f"No rows to train on in {table_name}.")
+        model.last_id_ = last_id
+        logger.info(f"Trained on {model.n_samples_seen_ - seen} new rows ({model.n_samples_seen_} total).")
+        mlflow.log_metric("n_samples_seen", model.n_samples_seen_)
+
+        joblib.dump(model, model_path)
+        joblib.dump(list(transform.predictors), "predictors.pkl")
+        return model, list(transform.predictors)
+
+    except Exception as e:
+        logger.error(e)
+        raise e
+
+
+@step(experiment_tracker="mlflow_tracker",
+      settings={"experiment_tracker.mlflow": {"experiment_name": "retail_price_optimization"}})
+def sweep_models(
+    X_train: Annotated[pd.DataFrame, "X_train"],
+    y_train: Annotated[pd.Series, "y_train"],
+    families: Optional[List[str]] = None,
+    k: int = 5,
+    n_jobs: Optional[int] = None,
+    prune_factor: Optional[float] = 1.5,
+) -> Tuple[
+    Annotated[object, "model"],
+    Annotated[List[str], "predictors"],
+    Annotated[pd.DataFrame, "sweep_results"],
+]:
+    """
+    Sweeps the registered estimator families (see steps/sweep.py) and keeps the best.
+
+    Every trial is logged as a nested MLflow run under this step's run; the
+    best completed trial is refit on all of X_train and saved like train_model.
+    """
+    try:
+        import joblib
+
+        results = run_sweep(X_train, y_train, families=families, k=k, n_jobs=n_jobs, prune_factor=prune_factor)
+        model = best_estimator(results, X_train, y_train)
+        best = results.iloc[0]
+        logger.info(f"Best trial: {best['family']} {best['params']} (cv_rmse={best['cv_rmse']:.4f})")
+        mlflow.log_metric("best_cv_rmse", best["cv_rmse"])
+
+        joblib.dump(model, "model.pkl")
+        joblib.dump(list(X_train.columns), "predictors.pkl")
+        results = results.assign(params=results["params"].map(str))
+        return model, X_train.columns.tolist(), results
+
+    except Exception as e:
+        logger.error(e)
+        raise e
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def retail_csv(tmp_path):
+    """The first 40 rows of data/retail_price.csv."""
+    path = tmp_path / "retail_price.csv"
+    pd.read_csv(os.path.join(ROOT, "data", "retail_price.csv"), nrows=40).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def sqlite_url(tmp_path, monkeypatch):
+    """A fresh SQLite database, exported as DB_URL."""
+    url = f"sqlite:///{tmp_path / 'retail.db'}"
+    monkeypatch.setenv("DB_URL", url)
+    return url
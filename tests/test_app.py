@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+import app as core
+
+PREDICTORS = ["unit_price", "customers", "lag_price"]
+
+
+class FailingAfter:
+    """Wraps a model so that predict fails after `calls` successful calls."""
+
+    def __init__(self, model, calls):
+        self.model = model
+        self.calls = calls
+
+    def predict(self, X):
+        if self.calls == 0:
+            raise RuntimeError("model crashed")
+        self.calls -= 1
+        return self.model.predict(X)
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(3)
+    X = pd.DataFrame(rng.uniform(1, 100, (30, len(PREDICTORS))), columns=PREDICTORS)
+    return LinearRegression().fit(X, X @ np.array([-0.3, 0.2, 0.1]) + 10)
+
+
+@pytest.fixture
+def client(model, monkeypatch):
+    monkeypatch.setattr(core, "mode", "local")
+    monkeypatch.setattr(core, "local_model", model)
+    monkeypatch.setattr(core, "predictors", PREDICTORS)
+    monkeypatch.setattr(core, "feature_transform", None)
+    monkeypatch.setattr(core, "encoders", None)
+    monkeypatch.setattr(core, "fast_scorer", None)
+    return core.app.test_client()
+
+
+def rows(n):
+    return [{"unit_price": 10.0 + i, "customers": 50.0, "lag_price": 9.0 + i} for i in range(n)]
+
+
+def test_records_are_scored(client, model):
+    response = client.post("/predict/batch", json=rows(5))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["count"] == 5
+    np.testing.assert_allclose(body["predictions"], model.predict(pd.DataFrame(rows(5))[PREDICTORS]))
+
+
+@pytest.mark.parametrize("payload", [[], {"columns": PREDICTORS, "data": []}])
+def test_empty_batch(client, payload):
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 200
+    assert response.get_json() == {"mode": "local", "count": 0, "predictions": []}
+
+
+@pytest.mark.parametrize("payload", [[1, 2], [{"unit_price": 1.0}, 2], {"columns": PREDICTORS, "data": [1, 2]}, "rows"])
+def test_malformed_rows_are_rejected(client, payload):
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_limits(client, monkeypatch):
+    monkeypatch.setitem(core.app.config, "MAX_BATCH_SIZE", 3)
+    assert client.post("/predict/batch", json=rows(4)).status_code == 413
+    monkeypatch.setitem(core.app.config, "MAX_BATCH_BYTES", 10)
+    assert client.post("/predict/batch", json=rows(1)).status_code == 413
+
+
+def test_failure_after_first_chunk_ends_the_json(client, model, monkeypatch):
+    monkeypatch.setitem(core.app.config, "BATCH_CHUNK_SIZE", 2)
+    monkeypatch.setattr(core, "local_model", FailingAfter(model, calls=1))
+    response = client.post("/predict/batch", json=rows(5))
+    body = response.get_json()
+    assert len(body["predictions"]) == 2
+    assert body["error"].startswith("Prediction failed after 2 rows")
+
+    monkeypatch.setattr(core, "local_model", FailingAfter(model, calls=0))
+    assert client.post("/predict/batch", json=rows(5)).status_code == 500
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from starlette.testclient import TestClient
+from zenml.integrations.mlflow.model_deployers.mlflow_model_deployer import MLFlowModelDeployer
+
+import app as core
+import asgi
+
+PREDICTORS = ["unit_price", "customers", "lag_price"]
+
+
+@pytest.fixture
+def model():
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame(rng.uniform(1, 100, (30, len(PREDICTORS))), columns=PREDICTORS)
+    return LinearRegression().fit(X, X @ np.array([-0.3, 0.2, 0.1]) + 10)
+
+
+@pytest.fixture
+def client(model, monkeypatch):
+    monkeypatch.setattr(core, "mode", "local")
+    monkeypatch.setattr(core, "local_model", model)
+    monkeypatch.setattr(core, "predictors", PREDICTORS)
+    monkeypatch.setattr(core, "feature_transform", None)
+    monkeypatch.setattr(core, "encoders", None)
+    monkeypatch.setattr(core, "fast_scorer", None)
+    with TestClient(asgi.app) as test_client:
+        yield test_client
+
+
+def rows(n):
+    return [{"unit_price": 10.0 + i, "customers": 50.0, "lag_price": 9.0 + i} for i in range(n)]
+
+
+def test_records_are_scored(client, model):
+    response = client.post("/predict/batch", json=rows(5))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 5
+    np.testing.assert_allclose(body["predictions"], model.predict(pd.DataFrame(rows(5))[PREDICTORS]))
+
+
+@pytest.mark.parametrize("payload", [[], {"columns": PREDICTORS, "data": []}])
+def test_empty_batch(client, payload):
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 200
+    assert response.json() == {"mode": "local", "count": 0, "predictions": []}
+
+
+@pytest.mark.parametrize("payload", [[1, 2], [{"unit_price": 1.0}, 2], {"columns": PREDICTORS, "data": [1, 2]}, "rows"])
+def test_malformed_rows_are_rejected(client, payload):
+    response = client.post("/predict/batch", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+def test_connecting_to_mlflow_does_not_start_the_form_batcher(monkeypatch):
+    class Service:
+        prediction_url = "http://127.0.0.1:1/invocations"
+
+    class Deployer:
+        def find_model_server(self, **kwargs):
+            return [Service()]
+
+    monkeypatch.setattr(MLFlowModelDeployer, "get_active_model_deployer", staticmethod(lambda: Deployer()),
+                        raising=False)
+    monkeypatch.setattr(core, "mode", "none")
+    monkeypatch.setattr(core, "model_service", None)
+    monkeypatch.setattr(core, "batcher", None)
+    monkeypatch.setitem(core.app.config, "MICROBATCH", True)
+
+    assert core.connect_mlflow()
+    assert core.mode == "mlflow"
+    assert core.batcher is None
+    # Flask's form path still gets one on first use
+    coalescer = core.service_batcher()
+    try:
+        assert coalescer is not None and core.service_batcher() is coalescer
+    finally:
+        coalescer.close()
@@ -0,0 +1,113 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sklearn.linear_model import LinearRegression
+
+from data.managament.engines import get_engine
+from data.managament.fill_table import fill_table
+from serving.stand_in_server import start_in_background
+from serving.transport import PredictionClient
+from steps.batch_predict import LocalScorer, ServiceScorer, batch_predict
+from steps.feature_transform import FeatureTransform
+
+
+@pytest.fixture
+def fitted(retail_csv):
+    df = pd.read_csv(retail_csv)
+    transform = FeatureTransform().fit(df)
+    X = transform.transform_frame(df)
+    # Fit on a column order other than the transform's
+    order = transform.predictors[::-1]
+    model = LinearRegression().fit(X[order], df[transform.target])
+    return df, transform, model, order
+
+
+def test_local_scorer_uses_model_feature_order(fitted):
+    df, transform, model, order = fitted
+    expected = model.predict(transform.transform_frame(df)[order])
+    # predictors.pkl in transform order must not change which coefficient meets which feature
+    scorer = LocalScorer(model, transform, transform.predictors)
+    np.testing.assert_allclose(scorer(df), expected, rtol=1e-9)
+
+
+def test_local_scorer_rejects_unknown_features(fitted):
+    _, transform, model, _ = fitted
+    transform.predictors = transform.predictors[1:]
+    with pytest.raises(ValueError):
+        LocalScorer(model, transform, transform.predictors)
+
+
+@pytest.fixture
+def served(fitted):
+    _, _, model, order = fitted
+    server, url = start_in_background(model, order)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+class StandInService:
+    """Just enough of MLFlowDeploymentService for batch_predict's binary transports."""
+
+    def __init__(self, url):
+        self.prediction_url = url
+
+    def start(self, timeout):
+        pass
+
+
+@pytest.mark.parametrize("transport", ["npy", "arrow"])
+def test_service_scorer_sends_the_served_feature_order(fitted, served, transport):
+    df, transform, model, order = fitted
+    scorer = ServiceScorer(StandInService(served), transform, order, transport)
+    try:
+        # npy has no column names, so the server takes the columns by position
+        np.testing.assert_allclose(scorer(df), model.predict(transform.transform_frame(df)[order]), rtol=1e-9)
+    finally:
+        scorer.close()
+
+
+def test_batch_predict_through_the_service(fitted, served, sqlite_url, retail_csv, tmp_path, monkeypatch):
+    df, transform, model, order = fitted
+    fill_table(mode="append", csv_path=retail_csv)
+    paths = {name: str(tmp_path / f"{name}.pkl") for name in ("predictors", "transform")}
+    joblib.dump(order, paths["predictors"])
+    transform.save(paths["transform"])
+    closed = []
+    close = PredictionClient.close
+    monkeypatch.setattr(PredictionClient, "close", lambda self: closed.append(self) or close(self))
+
+    written = batch_predict.entrypoint(service=StandInService(served), chunksize=15, n_jobs=2, transport="npy",
+                                       predictors_path=paths["predictors"], transform_path=paths["transform"],
+                                       model_version="test")
+
+    assert written == len(df)
+    assert len(closed) == 1
+    with get_engine(sqlite_url).connect() as conn:
+        stored = pd.read_sql(text("SELECT predicted_qty FROM retail_price_predictions ORDER BY id"), conn)
+    np.testing.assert_allclose(stored["predicted_qty"], model.predict(transform.transform_frame(df)[order]),
+                               rtol=1e-4, atol=1e-3)
+
+
+def test_batch_predict_writes_predictions(fitted, sqlite_url, retail_csv, tmp_path):
+    df, transform, model, order = fitted
+    fill_table(mode="append", csv_path=retail_csv)
+    paths = {name: str(tmp_path / f"{name}.pkl") for name in ("model", "predictors", "transform")}
+    joblib.dump(model, paths["model"])
+    joblib.dump(order, paths["predictors"])
+    transform.save(paths["transform"])
+
+    written = batch_predict.entrypoint(chunksize=15, n_jobs=2, model_path=paths["model"],
+                                       predictors_path=paths["predictors"], transform_path=paths["transform"],
+                                       model_version="test")
+
+    assert written == len(df)
+    with get_engine(sqlite_url).connect() as conn:
+        stored = pd.read_sql(text("SELECT id, predicted_qty, model_version FROM retail_price_predictions ORDER BY id"),
+                             conn)
+    assert set(stored["model_version"]) == {"test"}
+    # The table is read back with float32 prices, so only float32 agreement is expected
+    np.testing.assert_allclose(stored["predicted_qty"], model.predict(transform.transform_frame(df)[order]),
+                               rtol=1e-4, atol=1e-3)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from steps.encoders import ENCODED_COLUMNS, UNKNOWN_CODE, CategoryEncoder, EncoderSet
+
+
+@pytest.fixture
+def raw(retail_csv):
+    return pd.read_csv(retail_csv)
+
+
+@pytest.mark.parametrize("column", ENCODED_COLUMNS)
+def test_codes_match_label_encoder(raw, column):
+    expected = LabelEncoder().fit_transform(raw[column])
+    encoder = CategoryEncoder().fit(raw[column])
+    np.testing.assert_array_equal(encoder.transform(raw[column]), expected)
+    # Categorical input (as read with the compact dtypes) gives the same codes
+    np.testing.assert_array_equal(encoder.transform(raw[column].astype("category")), expected)
+    assert [encoder.transform_one(v) for v in raw[column]] == expected.tolist()
+
+
+def test_float32_scores_match_float64_classes(raw):
+    encoder = CategoryEncoder().fit(raw["product_score"])
+    np.testing.assert_array_equal(encoder.transform(raw["product_score"].astype(np.float32)),
+                                  LabelEncoder().fit_transform(raw["product_score"]))
+
+
+def test_unseen_values_and_nulls_get_unknown_code(raw):
+    encoder = CategoryEncoder().fit(raw["product_id"])
+    codes = encoder.transform(pd.Series(["no_such_product", None, raw["product_id"].iloc[0]]))
+    assert codes[:2].tolist() == [UNKNOWN_CODE, UNKNOWN_CODE]
+    assert codes[2] == encoder.transform_one(raw["product_id"].iloc[0])
+    assert encoder.transform_one("no_such_product") == UNKNOWN_CODE
+
+
+def test_encoder_set_round_trip(raw, tmp_path):
+    encoders = EncoderSet().fit(raw)
+    path = str(tmp_path / "encoders.pkl")
+    encoders.save(path)
+
+    encoded = EncoderSet.load(path).transform(raw.copy())
+    for column in ENCODED_COLUMNS:
+        np.testing.assert_array_equal(encoded[column], LabelEncoder().fit_transform(raw[column]))
+    untouched = [c for c in raw.columns if c not in ENCODED_COLUMNS]
+    pd.testing.assert_frame_equal(encoded[untouched], raw[untouched])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from data.managament.schema import CSV_DATE_FORMAT, load_csv
+from steps.encoders import ENCODED_COLUMNS
+from steps.feature_transform import FeatureTransform
+
+
+def reference_features(df: pd.DataFrame) -> pd.DataFrame:
+    """What categorical_encode + feature_engineer + dropping qty produced (with dd-mm-yyyy dates)."""
+    df = df.copy()
+    for col in ENCODED_COLUMNS:
+        df[col] = LabelEncoder().fit_transform(df[col])
+    dates = pd.to_datetime(df["month_year"], format=CSV_DATE_FORMAT)
+    df["month"] = dates.dt.month
+    df["year"] = dates.dt.year
+    df["is_weekend"] = dates.dt.dayofweek > 4
+    df = df.drop(columns=["month_year", "qty"]).fillna(0)
+    return df.astype(np.float64)
+
+
+@pytest.fixture
+def raw(retail_csv):
+    df = pd.read_csv(retail_csv)
+    df.loc[3, "freight_price"] = np.nan
+    return df
+
+
+def test_matches_reference_pipeline(raw):
+    transform = FeatureTransform().fit(raw)
+    expected = reference_features(raw)
+    assert transform.predictors == list(expected.columns)
+    pd.testing.assert_frame_equal(transform.transform_frame(raw), expected)
+
+
+def test_compact_dtypes_give_the_same_features(raw, retail_csv):
+    transform = FeatureTransform().fit(raw)
+    compact = load_csv(retail_csv)
+    compact.loc[3, "freight_price"] = np.nan
+    X = transform.transform_frame(compact)
+    expected = reference_features(raw)
+    # Codes and date features are exact; prices only agree to float32 precision
+    exact = ENCODED_COLUMNS + ["month", "year", "is_weekend"]
+    pd.testing.assert_frame_equal(X[exact], expected[exact])
+    np.testing.assert_allclose(X.to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+
+def test_unseen_rows_and_missing_columns(raw):
+    transform = FeatureTransform().fit(raw)
+    new = raw.head(2).drop(columns=["lag_price"])
+    new.loc[0, "product_id"] = "no_such_product"
+    X = transform.transform_frame(new)
+    assert X.loc[0, "product_id"] == -1
+    assert (X["lag_price"] == 0).all()
@@ -0,0 +1,138 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_mock_engine, text
+from sqlalchemy.dialects import postgresql
+
+from data.managament.engines import get_engine
+from data.managament.fill_table import _load_postgres, bulk_load_csv, fill_table, read_csv_chunks
+from data.managament.index import Base, RetailPrices
+from data.managament.schema import load_csv
+
+
+def read_table(url: str) -> pd.DataFrame:
+    with get_engine(url).connect() as conn:
+        return pd.read_sql(text("SELECT * FROM retail_prices ORDER BY id"), conn)
+
+
+def test_skip_and_append(sqlite_url, retail_csv):
+    fill_table(mode="skip", csv_path=retail_csv)
+    first = read_table(sqlite_url)
+    assert len(first) == 40
+    assert first["month_year"].notna().all()
+
+    fill_table(mode="skip", csv_path=retail_csv)
+    assert len(read_table(sqlite_url)) == 40
+
+    fill_table(mode="append", csv_path=retail_csv, chunksize=15)
+    assert len(read_table(sqlite_url)) == 80
+
+
+def test_upsert_updates_in_place_and_inserts_new_keys(sqlite_url, retail_csv, tmp_path):
+    fill_table(mode="append", csv_path=retail_csv)
+    before = read_table(sqlite_url)
+
+    csv = pd.read_csv(retail_csv)
+    csv.loc[0, "unit_price"] = 999
+    extra = csv.iloc[[1]].copy()
+    extra["product_id"] = "new_product"
+    upsert_csv = str(tmp_path / "upsert.csv")
+    pd.concat([csv, extra]).to_csv(upsert_csv, index=False)
+    fill_table(mode="upsert", csv_path=upsert_csv, chunksize=15)
+
+    after = read_table(sqlite_url)
+    assert len(after) == 41
+    # Existing (product_id, month_year) keys keep their ids
+    pd.testing.assert_series_equal(after["id"].iloc[:40], before["id"])
+    assert after.loc[0, "unit_price"] == 999
+    pd.testing.assert_frame_equal(after.iloc[1:40], before.iloc[1:40])
+    assert after.iloc[40]["product_id"] == "new_product"
+
+
+def test_csv_chunks_parse_like_load_csv(retail_csv):
+    chunks = list(read_csv_chunks(retail_csv, chunksize=15))
+    assert len(chunks) == 3
+    assert len({tuple(c.dtypes.astype(str)) for c in chunks}) == 1
+    assert "id" not in chunks[0].columns and "qty" in chunks[0].columns
+    streamed = pd.concat(chunks, ignore_index=True)
+    whole = load_csv(retail_csv, precision="full")[streamed.columns]
+    pd.testing.assert_frame_equal(streamed.astype(object), whole.astype(object), check_dtype=False)
+    assert streamed["unit_price"].dtype == "float64"
+
+
+def test_unknown_mode_is_rejected(sqlite_url, retail_csv):
+    with pytest.raises(ValueError):
+        bulk_load_csv(get_engine(sqlite_url), retail_csv, mode="replace")
+
+
+class RecordingCursor:
+    """Stands in for a psycopg2 cursor; records SQL instead of running it."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, sql):
+        self.log.append(sql)
+
+    def copy_expert(self, sql, buf):
+        self.log.append(sql)
+
+
+class RecordingEngine:
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.log = []
+        self.committed = False
+
+    def raw_connection(self):
+        engine = self
+
+        class Raw:
+            def cursor(self):
+                return RecordingCursor(engine.log)
+
+            def commit(self):
+                engine.committed = True
+
+            def rollback(self):
+                pass
+
+            def close(self):
+                pass
+
+        return Raw()
+
+
+def test_postgres_ddl_gives_id_a_sequence_default():
+    statements = []
+    engine = create_mock_engine("postgresql+psycopg2://",
+                                lambda sql, *a, **k: statements.append(str(sql.compile(dialect=engine.dialect))))
+    Base.metadata.create_all(engine, tables=[RetailPrices.__table__], checkfirst=False)
+    assert statements[0].strip() == "CREATE SEQUENCE retail_prices_id_seq"
+    assert statements[1].lstrip().startswith("CREATE TABLE retail_prices")
+    assert statements[2] == "ALTER TABLE retail_prices ALTER COLUMN id SET DEFAULT nextval('retail_prices_id_seq')"
+
+
+def test_postgres_append_copies_without_id(retail_csv):
+    engine = RecordingEngine()
+    assert _load_postgres(engine, read_csv_chunks(retail_csv, chunksize=15), "append") == 40
+    assert engine.committed
+    # Existing tables are migrated to the id default before COPY relies on it
+    assert engine.log[0] == "ALTER TABLE retail_prices ALTER COLUMN id SET DEFAULT nextval('retail_prices_id_seq')"
+    copies = engine.log[1:]
+    assert len(copies) == 3
+    assert all(sql.startswith("COPY retail_prices (product_id, ") for sql in copies)
+    assert all("(id" not in sql and " id," not in sql for sql in copies)
+
+
+def test_postgres_upsert_stages_without_id(retail_csv):
+    engine = RecordingEngine()
+    _load_postgres(engine, read_csv_chunks(retail_csv), "upsert")
+    alter, create, drop, copy, update, insert = engine.log
+    assert create == "CREATE TEMP TABLE staging_retail_prices (LIKE retail_prices) ON COMMIT DROP"
+    assert drop == "ALTER TABLE staging_retail_prices DROP COLUMN id"
+    assert copy.startswith("COPY staging_retail_prices (product_id, ")
+    assert update.startswith("UPDATE retail_prices t SET product_category_name = s.product_category_name")
+    assert "t.product_id = s.product_id AND t.month_year = s.month_year" in update
+    assert insert.startswith("INSERT INTO retail_prices (product_id, ")
+    assert "id" not in insert.split("(")[1].split(")")[0].split(", ")
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from sklearn.metrics import mean_squared_error
+
+from steps.model_building import IncrementalLinearRegressionModel, IncrementalOLS
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(1)
+    n = 600
+    X = pd.DataFrame({
+        "unit_price": rng.uniform(20, 200, n),
+        "customers": rng.uniform(10, 100, n),
+        # Large offset with little spread, like year in the real table
+        "year": rng.integers(2017, 2019, n).astype(float),
+    })
+    y = pd.Series(40 - 0.2 * X["unit_price"] + 0.3 * X["customers"] + 2.0 * (X["year"] - 2017)
+                  + rng.normal(0, 2, n), name="qty")
+    return X, y
+
+
+def chunked(X, y, size):
+    return [(X.iloc[i:i + size], y.iloc[i:i + size]) for i in range(0, len(X), size)]
+
+
+def test_incremental_ols_matches_statsmodels(data):
+    X, y = data
+    reference = sm.OLS(y, sm.add_constant(X)).fit()
+
+    model = IncrementalOLS()
+    for X_chunk, y_chunk in chunked(X, y, 97):
+        model.partial_fit(X_chunk, y_chunk)
+
+    assert model.n_samples_seen_ == len(X)
+    np.testing.assert_allclose(model.params_[reference.params.index], reference.params, rtol=1e-7)
+    np.testing.assert_allclose(model.bse_[reference.bse.index], reference.bse, rtol=1e-6)
+    np.testing.assert_allclose(model.pvalues_[reference.pvalues.index], reference.pvalues, rtol=1e-5, atol=1e-12)
+    np.testing.assert_allclose(model.predict(X), reference.predict(sm.add_constant(X)), rtol=1e-9)
+
+
+def test_fit_restarts_accumulation(data):
+    X, y = data
+    model = IncrementalOLS().partial_fit(X.iloc[:100], y.iloc[:100])
+    model.fit(X, y)
+    assert model.n_samples_seen_ == len(X)
+    np.testing.assert_allclose(model.coef_, IncrementalOLS().fit(X, y).coef_)
+
+
+def test_partial_fit_rejects_other_columns(data):
+    X, y = data
+    model = IncrementalOLS().partial_fit(X.iloc[:100], y.iloc[:100])
+    with pytest.raises(ValueError):
+        model.partial_fit(X.iloc[100:200, ::-1], y.iloc[100:200])
+
+
+def test_incremental_validate_matches_refit_per_fold(data):
+    X, y = data
+    k = 5
+    wrapper = IncrementalLinearRegressionModel(chunks=chunked(X, y, 83))
+    wrapper.train()
+    rmse = wrapper.validate(k=k)
+
+    folds = np.arange(len(X)) % k
+    errors = []
+    for fold in range(k):
+        train, test = folds != fold, folds == fold
+        fitted = sm.OLS(y[train], sm.add_constant(X[train])).fit()
+        errors.append(mean_squared_error(y[test], fitted.predict(sm.add_constant(X[test]))))
+
+    np.testing.assert_allclose(wrapper.cv_errors, errors, rtol=1e-6)
+    assert rmse == pytest.approx(np.sqrt(np.mean(errors)), rel=1e-6)
+
+
+def test_incremental_validate_needs_rows():
+    wrapper = IncrementalLinearRegressionModel(chunks=iter([]))
+    with pytest.raises(ValueError):
+        wrapper.validate(k=3)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from steps.price_optimizer import PriceOptimizer, linear_coefficients
+
+PREDICTORS = ["unit_price", "total_price", "lag_price", "customers"]
+
+
+@pytest.fixture
+def fitted():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        "unit_price": rng.uniform(20, 200, n),
+        "customers": rng.uniform(10, 100, n),
+    })
+    df["total_price"] = df["unit_price"] * rng.uniform(1, 3, n)
+    df["lag_price"] = df["unit_price"] * rng.uniform(0.9, 1.1, n)
+    qty = 80 - 0.35 * df["unit_price"] + 0.02 * df["total_price"] + 0.2 * df["customers"] + rng.normal(0, 1, n)
+    model = LinearRegression().fit(df[PREDICTORS], qty)
+    return model, df
+
+
+@pytest.mark.parametrize("objective", ["revenue", "margin"])
+def test_closed_form_matches_dense_grid(fitted, objective):
+    model, df = fitted
+    options = dict(objective=objective, price_range=(0.5, 1.5),
+                   unit_cost="unit_cost" if objective == "margin" else None)
+    df = df.assign(unit_cost=df["unit_price"] * 0.4)
+
+    closed = PriceOptimizer(model, PREDICTORS, method="closed_form", **options).optimize(df)
+    grid = PriceOptimizer(model, PREDICTORS, method="grid", n_points=2001, **options).optimize(df)
+
+    value = f"expected_{objective}"
+    # The exact optimum is never beaten by a grid point, and a dense grid gets close to it
+    assert (closed[value] >= grid[value] - 1e-6).all()
+    np.testing.assert_allclose(closed[value], grid[value], rtol=1e-4)
+    np.testing.assert_allclose(closed[f"current_{objective}"], grid[f"current_{objective}"], rtol=1e-9)
+    step = df["unit_price"] / 2000
+    assert (np.abs(closed["optimal_price"] - grid["optimal_price"]) <= step + 1e-9).all()
+
+
+def test_optimal_price_stays_within_bounds(fitted):
+    model, df = fitted
+    result = PriceOptimizer(model, PREDICTORS, price_range=(0.9, 1.1), max_price=150.0).optimize(df)
+    assert (result["optimal_price"] >= df["unit_price"] * 0.9 - 1e-9).all()
+    assert (result["optimal_price"] <= np.minimum(df["unit_price"] * 1.1, np.maximum(150.0, df["unit_price"] * 0.9)) + 1e-9).all()
+
+
+def test_linear_coefficients_follow_predictor_order(fitted):
+    model, _ = fitted
+    coef, intercept = linear_coefficients(model, PREDICTORS[::-1])
+    np.testing.assert_allclose(coef, model.coef_[::-1])
+    assert intercept == pytest.approx(model.intercept_)
+    assert linear_coefficients(model, PREDICTORS[:2]) is None
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from data.managament import dataset_cache
+from data.managament.fill_table import fill_table
+from steps import step_cache
+from steps.ingest_data import ingest_data
+from steps.step_cache import StepCache, cached_step
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    store = StepCache(str(tmp_path / "steps"))
+    monkeypatch.setattr(step_cache, "StepCache", lambda: store)
+    monkeypatch.setenv("STEP_CACHE", "1")
+    return store
+
+
+def test_hit_replays_side_effects(cache):
+    calls, replayed = [], []
+
+    @cached_step(on_hit=lambda value, arguments: replayed.append((value, arguments["x"])))
+    def double(x: int) -> int:
+        calls.append(x)
+        return 2 * x
+
+    assert double(3) == 6
+    assert double(3) == 6
+    assert calls == [3]
+    assert replayed == [(6, 3)]
+
+
+@pytest.mark.parametrize("checksum", [False, True])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_ingest_sees_upserted_rows(cache, sqlite_url, retail_csv, tmp_path, monkeypatch, use_cache, checksum):
+    monkeypatch.chdir(tmp_path)
+    fill_table(mode="append", csv_path=retail_csv)
+    before = ingest_data.entrypoint(use_cache=use_cache, checksum=checksum)
+    assert ingest_data.entrypoint(use_cache=use_cache, checksum=checksum).equals(before)
+
+    # Same row count and ids; only a price changes in place
+    updated = pd.read_csv(retail_csv)
+    updated.loc[0, "unit_price"] = 999
+    updated.to_csv(retail_csv, index=False)
+    fill_table(mode="upsert", csv_path=retail_csv)
+
+    after = ingest_data.entrypoint(use_cache=use_cache, checksum=checksum)
+    assert len(after) == len(before)
+    assert after.loc[after["id"] == before.loc[0, "id"], "unit_price"].item() == 999
+
+
+def test_cache_hit_does_not_scan_the_table(cache, sqlite_url, retail_csv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fill_table(mode="append", csv_path=retail_csv)
+
+    def scan(*args, **kwargs):
+        raise AssertionError("table_checksum called without checksum=True")
+
+    monkeypatch.setattr(dataset_cache, "table_checksum", scan)
+    before = ingest_data.entrypoint(use_cache=True)
+    monkeypatch.setattr(pd, "read_sql", None)  # a hit must not query the rows
+    assert ingest_data.entrypoint(use_cache=True).equals(before)
+
+
+def test_incremental_runs_bypass_the_step_cache(cache, sqlite_url, retail_csv, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fill_table(mode="append", csv_path=retail_csv)
+    df = ingest_data.entrypoint(incremental=True, cache_dir=str(tmp_path / "ingest"))
+    assert len(df) == 40
+    assert not (tmp_path / "steps").exists()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from serving.stand_in_server import start_in_background
+from serving.transport import PredictionClient
+
+PREDICTORS = ["unit_price", "freight_price", "customers", "lag_price"]
+# JSON carries floats as text with 10 significant digits; the binary formats are exact
+RTOL = {"npy": 1e-12, "arrow": 1e-12, "json": 1e-8}
+
+
+@pytest.fixture(scope="module")
+def served():
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame(rng.uniform(1, 100, (50, len(PREDICTORS))), columns=PREDICTORS)
+    y = X @ np.array([-0.4, 0.1, 0.3, 0.05]) + 20
+    model = LinearRegression().fit(X, y)
+    server, url = start_in_background(model, PREDICTORS)
+    yield model, X, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("fmt", ["npy", "arrow", "json"])
+def test_round_trip_matches_local_predict(served, fmt):
+    model, X, url = served
+    expected = model.predict(X)
+    with PredictionClient(url, fmt=fmt, chunk_rows=7, max_concurrency=3) as client:
+        np.testing.assert_allclose(client.predict(X), expected, rtol=RTOL[fmt])
+        # Unnamed columns are scored by position, never as missing features
+        np.testing.assert_allclose(client.predict(X.to_numpy()), expected, rtol=RTOL[fmt])
+        # Named columns are matched by name, whatever their order
+        if fmt != "npy":
+            np.testing.assert_allclose(client.predict(X[PREDICTORS[::-1]]), expected, rtol=RTOL[fmt])
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "json"])
+def test_client_attaches_column_names(served, fmt):
+    model, X, url = served
+    with PredictionClient(url, fmt=fmt, columns=PREDICTORS) as client:
+        np.testing.assert_allclose(client.predict(X.to_numpy()), model.predict(X), rtol=RTOL[fmt])
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "json"])
+def test_missing_feature_is_rejected(served, fmt):
+    _, X, url = served
+    with PredictionClient(url, fmt=fmt) as client:
+        with pytest.raises(RuntimeError, match="Missing features"):
+            client.predict(X.drop(columns=["customers"]))
+
+
+def test_worker_pool_is_reused(served):
+    _, X, url = served
+    client = PredictionClient(url, fmt="npy", chunk_rows=10, max_concurrency=2)
+    client.predict(X)
+    pool = client._pool
+    client.predict(X)
+    assert client._pool is pool
+    client.close()
+    assert client._pool is None